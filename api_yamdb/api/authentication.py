@@ -0,0 +1,35 @@
+# api_yamdb/api/authentication.py
+import copy
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import user_cache
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с коротким кэшем пользователей.
+
+    Пользователь из токена берётся из кэша, и запрос к таблице
+    пользователей выполняется только при промахе. Запись вытесняется
+    при любом сохранении или удалении пользователя, в том числе при
+    смене роли через UserViewSet.
+
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        key = user_cache_key(user_id)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        return copy.copy(user)
+
+
+def invalidate_cached_user(user_id):
+    user_cache.delete(user_cache_key(user_id))
@@ -0,0 +1,346 @@
+# api_yamdb/api/benchmark.py
+import json
+import math
+import time
+from itertools import count
+
+from django.contrib.auth.hashers import make_password
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.activity import rebuild_comment_counts
+from reviews.models import ADMIN, Category, Comment, Genre, Review, Title
+from reviews.facets import rebuild_facets
+from reviews.models import User
+from reviews.ratings import rebuild_ratings
+from .cache import response_cache
+from .readers import TitleReader, ordered_genres
+from .serializers import TitleReadSerializer
+
+CONFIRMATION_CODE = 'benchmark'
+
+
+def seed(titles=100, reviews_per_title=10, comments_per_review=2,
+         categories=5, genres=10, batch_size=5000):
+    """Заполняет базу каталогом заданного размера через bulk_create."""
+    authors_count = max(reviews_per_title, comments_per_review, 1)
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(
+            username=f'bench_user_{number}',
+            email=f'bench_user_{number}@yamdb.fake',
+            password=password,
+            confirmation_code=CONFIRMATION_CODE
+        )
+        for number in range(authors_count)
+    )
+    admin = User.objects.create(
+        username='bench_admin', email='bench_admin@yamdb.fake',
+        password=password, role=ADMIN
+    )
+    authors = list(User.objects.filter(username__startswith='bench_user_'))
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'bench-category-{number}')
+        for number in range(categories)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'bench-genre-{number}')
+        for number in range(genres)
+    )
+    category_list = list(Category.objects.filter(slug__startswith='bench-'))
+    genre_list = list(Genre.objects.filter(slug__startswith='bench-'))
+    Title.objects.bulk_create(
+        (
+            Title(
+                name=f'Произведение {number}',
+                year=1950 + number % 70,
+                description='Описание произведения',
+                category=category_list[number % len(category_list)]
+            )
+            for number in range(titles)
+        ),
+        batch_size=batch_size
+    )
+    title_list = list(
+        Title.objects.filter(name__startswith='Произведение ')
+        .order_by('pk')
+    )
+    title_genre = Title.genre.through
+    title_genre.objects.bulk_create(
+        (
+            title_genre(title=title, genre=genre_list[(title.pk + shift)
+                                                      % len(genre_list)])
+            for title in title_list
+            for shift in range(min(2, len(genre_list)))
+        ),
+        batch_size=batch_size
+    )
+    rebuild_facets()
+    Review.objects.bulk_create(
+        (
+            Review(
+                title=title,
+                author=authors[number],
+                text='Текст отзыва ' * 20,
+                score=1 + (title.pk + number) % 10
+            )
+            for title in title_list
+            for number in range(reviews_per_title)
+        ),
+        batch_size=batch_size
+    )
+    rebuild_ratings()
+    first_reviews = Review.objects.filter(
+        title=title_list[0]).order_by('pk') if title_list else []
+    Comment.objects.bulk_create(
+        (
+            Comment(review=review, author=authors[number], text='Комментарий')
+            for review in first_reviews
+            for number in range(comments_per_review)
+        ),
+        batch_size=batch_size
+    )
+    rebuild_comment_counts(Review.objects.filter(pk__in=first_reviews))
+    title = title_list[0] if title_list else None
+    review = Review.objects.filter(title=title).order_by('pk').first()
+    comment = Comment.objects.filter(review=review).order_by('pk').first()
+    return {
+        'admin': admin,
+        'user': authors[0],
+        'title': title,
+        'review': review,
+        'comment': comment,
+        'category': category_list[0],
+        'genre': genre_list[0],
+    }
+
+
+class LocalTransport:
+    """Запросы через тестовый клиент Django в том же процессе."""
+
+    def __init__(self):
+        self.clients = {}
+
+    def client(self, user):
+        key = user.pk if user else None
+        if key not in self.clients:
+            client = APIClient()
+            if user is not None:
+                token = RefreshToken.for_user(user).access_token
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.clients[key] = client
+        return self.clients[key]
+
+    def request(self, method, url, user=None, data=None):
+        client = self.client(user)
+        response = getattr(client, method)(url, data, format='json')
+        return response.status_code
+
+
+class HttpTransport:
+    """Запросы к запущенному серверу, например gunicorn."""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.tokens = {}
+
+    def headers(self, user):
+        if user is None:
+            return {}
+        if user.pk not in self.tokens:
+            token = RefreshToken.for_user(user).access_token
+            self.tokens[user.pk] = str(token)
+        return {'Authorization': f'Bearer {self.tokens[user.pk]}'}
+
+    def request(self, method, url, user=None, data=None):
+        response = self.session.request(
+            method.upper(),
+            self.base_url + url,
+            json=data,
+            headers=self.headers(user)
+        )
+        return response.status_code
+
+
+def build_scenarios(data):
+    """Сценарии для всех маршрутов api/urls.py."""
+    title = data['title']
+    review = data['review']
+    comment = data['comment']
+    user = data['user']
+    admin = data['admin']
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{title.pk}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    signups = count()
+
+    def signup():
+        number = next(signups)
+        return {
+            'username': f'bench_signup_{number}_{time.monotonic_ns()}',
+            'email': f'bench_signup_{number}_{time.monotonic_ns()}@yamdb.fake',
+        }
+
+    def token():
+        return {
+            'username': user.username,
+            'confirmation_code': CONFIRMATION_CODE,
+        }
+
+    return [
+        ('categories.list', 'get', '/api/v1/categories/', None, None),
+        ('genres.list', 'get', '/api/v1/genres/', None, None),
+        ('titles.list', 'get', titles, None, None),
+        ('titles.list.filter_genre', 'get',
+         f'{titles}?genre={data["genre"].slug}', None, None),
+        ('titles.list.filter_category', 'get',
+         f'{titles}?category={data["category"].slug}', None, None),
+        ('titles.list.filter_name', 'get', f'{titles}?name=дение 1',
+         None, None),
+        ('titles.list.filter_year', 'get',
+         f'{titles}?year_min=1960&year_max=1970', None, None),
+        ('titles.list.offset', 'get', f'{titles}?offset=50', None, None),
+        ('titles.list.cursor', 'get', f'{titles}?pagination=cursor',
+         None, None),
+        ('titles.retrieve', 'get', f'{titles}{title.pk}/', None, None),
+        ('titles.facets', 'get', f'{titles}facets/', None, None),
+        ('titles.facets.filter_genre', 'get',
+         f'{titles}facets/?genre={data["genre"].slug}', None, None),
+        ('titles.top', 'get', f'{titles}top/', None, None),
+        ('titles.trending', 'get', f'{titles}trending/', None, None),
+        ('reviews.list', 'get', reviews, None, None),
+        ('reviews.retrieve', 'get', f'{reviews}{review.pk}/', None, None),
+        ('comments.list', 'get', comments, None, None),
+        ('comments.retrieve', 'get', f'{comments}{comment.pk}/',
+         None, None),
+        ('comments.create', 'post', comments, user,
+         lambda: {'text': 'Комментарий из бенчмарка'}),
+        ('users.list', 'get', '/api/v1/users/', admin, None),
+        ('users.retrieve', 'get', f'/api/v1/users/{user.username}/',
+         admin, None),
+        ('users.me', 'get', '/api/v1/users/me/', user, None),
+        ('auth.signup', 'post', '/api/v1/auth/signup/', None, signup),
+        ('auth.token', 'post', '/api/v1/auth/token/', None, token),
+    ]
+
+
+def percentile(sorted_values, share):
+    """Перцентиль по ближайшему рангу."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(share * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(transport, scenario, iterations, warmup, use_cache=True):
+    name, method, url, user, payload = scenario
+    statuses = {}
+    durations = []
+    for step in range(warmup + iterations):
+        data = payload() if payload else None
+        if not use_cache:
+            response_cache.invalidate()
+        started = time.perf_counter()
+        status_code = transport.request(method, url, user, data)
+        elapsed = time.perf_counter() - started
+        if step >= warmup:
+            durations.append(elapsed)
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+    durations.sort()
+    total = sum(durations)
+    return {
+        'endpoint': name,
+        'method': method.upper(),
+        'url': url,
+        'requests': len(durations),
+        'statuses': {str(code): number for code, number in statuses.items()},
+        'throughput_rps': len(durations) / total if total else 0.0,
+        'p50_ms': percentile(durations, 0.50) * 1000,
+        'p95_ms': percentile(durations, 0.95) * 1000,
+        'p99_ms': percentile(durations, 0.99) * 1000,
+    }
+
+
+def run_benchmark(transport, data, iterations=50, warmup=5, use_cache=True,
+                  only=None):
+    """Прогоняет все сценарии и возвращает результаты по эндпоинтам."""
+    results = []
+    for scenario in build_scenarios(data):
+        if only and not any(part in scenario[0] for part in only):
+            continue
+        results.append(
+            measure(transport, scenario, iterations, warmup, use_cache)
+        )
+    return results
+
+
+def measure_serialization(size=1000, repeat=5):
+    """Стоимость сборки JSON для size произведений двумя способами.
+
+    Время включает запросы к базе и рендеринг: через
+    TitleReadSerializer и через TitleReader. Берётся лучший из
+    repeat прогонов и пересчитывается на 1000 произведений.
+
+    """
+    queryset = Title.objects.select_related('category').prefetch_related(
+        ordered_genres()).order_by('name', 'id')
+    reader = TitleReader()
+    renderer = JSONRenderer()
+
+    def serializer():
+        return renderer.render(
+            TitleReadSerializer(queryset[:size], many=True).data
+        )
+
+    def values():
+        return renderer.render(
+            reader.to_representation(reader.values(queryset)[:size])
+        )
+
+    result = {'titles': queryset[:size].count()}
+    outputs = {}
+    for name, build in (('serializer', serializer), ('values', values)):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            outputs[name] = build()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        result[f'{name}_ms_per_1000'] = (
+            best * 1000 * 1000 / result['titles'] if result['titles'] else 0.0
+        )
+    result['identical'] = outputs['serializer'] == outputs['values']
+    return result
+
+
+def compare(results, baseline):
+    """Сопоставляет результаты с сохранёнными ранее по имени эндпоинта."""
+    previous = {row['endpoint']: row for row in baseline['results']}
+    rows = []
+    for row in results:
+        before = previous.get(row['endpoint'])
+        if before is None:
+            continue
+        rows.append({
+            'endpoint': row['endpoint'],
+            'p50_change': change(before['p50_ms'], row['p50_ms']),
+            'p95_change': change(before['p95_ms'], row['p95_ms']),
+            'throughput_change': change(
+                before['throughput_rps'], row['throughput_rps']
+            ),
+        })
+    return rows
+
+
+def change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def dump(path, payload):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(payload, file, ensure_ascii=False, indent=2)
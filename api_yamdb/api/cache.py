@@ -0,0 +1,237 @@
+# api_yamdb/api/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+VERSION_KEY = 'version'
+INVALIDATED_KEY = 'invalidated_at'
+
+
+class LocMemBackend:
+    """LRU-кэш в памяти процесса с ограничением размера и времени жизни.
+
+    Счётчики хранятся отдельно от записей и не вытесняются.
+
+    """
+
+    def __init__(self, max_entries=1000, timeout=60, **kwargs):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def set_counter(self, key, value):
+        with self._lock:
+            self._counters[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+class DjangoCacheBackend:
+    """Общий для всех воркеров кэш поверх django.core.cache."""
+
+    def __init__(self, alias='default', timeout=60, prefix='api', **kwargs):
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f'{self.prefix}:{key}'
+
+    def get(self, key):
+        return self.cache.get(self.make_key(key))
+
+    def set(self, key, value):
+        self.cache.set(self.make_key(key), value, self.timeout)
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key))
+
+    def get_counter(self, key):
+        return self.cache.get(self.make_key(key), 0)
+
+    def set_counter(self, key, value):
+        self.cache.set(self.make_key(key), value, None)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def load_backend(config):
+    """Создаёт бэкенд по словарю из настроек: BACKEND и OPTIONS."""
+    backend_class = import_string(config['BACKEND'])
+    options = {
+        key.lower(): value
+        for key, value in config.get('OPTIONS', {}).items()
+    }
+    return backend_class(**options)
+
+
+class ResponseCache:
+    """Кэш ответов API на чтение с версионной инвалидацией.
+
+    Ключ строится из версии, роли пользователя, пути и отсортированных
+    параметров запроса. Любая запись в каталог меняет версию, и все
+    прежние записи перестают находиться, а затем вытесняются.
+
+    Тела ответов могут лежать в памяти воркера, но версия и время
+    сброса хранятся в versions — общем для воркеров бэкенде, иначе
+    запись через один воркер не сбросит кэш остальных.
+
+    """
+
+    def __init__(self, backend, versions=None):
+        self.backend = backend
+        self.versions = versions or backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.API_RESPONSE_CACHE
+        versions = config.get('VERSIONS')
+        return cls(
+            load_backend(config),
+            versions and load_backend(versions),
+        )
+
+    @staticmethod
+    def get_role(user):
+        if not user or not user.is_authenticated:
+            return 'anonymous'
+        if user.is_superuser:
+            return 'superuser'
+        return user.role
+
+    def make_key(self, request):
+        query = sorted(request.query_params.lists())
+        raw = '|'.join((
+            self.get_role(request.user),
+            request.accepted_media_type or '',
+            request.path,
+            repr(query),
+        ))
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        version = self.versions.get_counter(VERSION_KEY)
+        return f'response:{version}:{digest}'
+
+    def get(self, key):
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data)
+
+    def invalidate(self):
+        # Версия — время в наносекундах, а не счётчик: incr кэша в базе
+        # не атомарен, и два одновременных сброса дали бы одну версию.
+        version = time.time_ns()
+        self.versions.set(INVALIDATED_KEY, time.time())
+        self.versions.set_counter(VERSION_KEY, version)
+        return version
+
+    def invalidated_at(self):
+        """Время последней инвалидации или 0, если она давно истекла."""
+        return self.versions.get(INVALIDATED_KEY) or 0.0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'version': self.versions.get_counter(VERSION_KEY),
+        }
+
+
+response_cache = SimpleLazyObject(ResponseCache.from_settings)
+user_cache = SimpleLazyObject(
+    lambda: load_backend(settings.API_USER_CACHE)
+)
+replica_pins = SimpleLazyObject(
+    lambda: load_backend(settings.API_REPLICA_PINS)
+)
+
+
+def is_process_local(backend):
+    """Видно ли содержимое бэкенда только текущему процессу."""
+    if isinstance(backend, LocMemBackend):
+        return True
+    if isinstance(backend, DjangoCacheBackend):
+        return isinstance(backend.cache, LocMemCache)
+    return False
+
+
+def shared_backends():
+    """Бэкенды, изменения в которых должны видеть все воркеры."""
+    return {
+        'API_USER_CACHE': user_cache,
+        'API_RESPONSE_CACHE[VERSIONS]': response_cache.versions,
+    }
+
+
+def check_shared_backends(workers):
+    """Не даёт запустить несколько воркеров с кэшами в памяти процесса.
+
+    Иначе воркер, не обработавший смену роли или удаление
+    пользователя, пускает его с прежними правами до истечения кэша.
+
+    """
+    if workers <= 1:
+        return
+    local = sorted(
+        name for name, backend in shared_backends().items()
+        if is_process_local(backend)
+    )
+    if local:
+        raise ImproperlyConfigured(
+            f'При {workers} воркерах кэши {", ".join(local)} должны быть '
+            'общими: укажите api.cache.DjangoCacheBackend и CACHE_BACKEND '
+            'не в памяти процесса.'
+        )
@@ -0,0 +1,22 @@
+# api_yamdb/api/db.py
+from django.db import connections
+
+
+def close_unusable_connections(**kwargs):
+    """Проверяет постоянные соединения перед началом запроса.
+
+    Аналог CONN_HEALTH_CHECKS из Django 4.1: соединение, оставшееся
+    от прошлого запроса, проверяется, и если сервер его уже закрыл
+    (перезапуск, idle timeout, переключение реплики), оно закрывается
+    и будет открыто заново, а не уронит запрос.
+
+    """
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+        if not connection.settings_dict.get('CONN_HEALTH_CHECKS'):
+            continue
+        if connection.in_atomic_block:
+            continue
+        if not connection.is_usable():
+            connection.close()
@@ -0,0 +1,112 @@
+# api_yamdb/api/facets.py
+from django.db.models import Count
+from django.utils.functional import cached_property
+from django_filters.utils import translate_validation
+
+from reviews.models import FACET_CATEGORY, FACET_GENRE, FACET_YEAR
+from reviews.models import Category, FacetCount, Genre, Title
+
+FACETS = {
+    'genre': ('genre',),
+    'category': ('category',),
+    'year': ('year', 'year_min', 'year_max'),
+}
+
+
+class TitleFacets:
+    """Число произведений по жанрам, категориям и годам.
+
+    Каждый фасет учитывает все фильтры, кроме своего собственного:
+    при выбранном жанре остальные жанры показывают, сколько
+    произведений добавит их выбор. Фасет без фильтров читается из
+    счётчиков FacetCount и стоит столько же при любом размере
+    каталога, отфильтрованный считается одним сгруппированным
+    запросом.
+
+    """
+
+    def __init__(self, filterset_class, params):
+        self.filterset_class = filterset_class
+        self.params = params
+
+    def filter(self, exclude=()):
+        """Произведения, отобранные всеми фильтрами, кроме exclude."""
+        params = self.params.copy()
+        for name in exclude:
+            params.pop(name, None)
+        filterset = self.filterset_class(params, queryset=Title.objects.all())
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        if not any(
+                params.get(name) not in (None, '')
+                for name in filterset.filters):
+            return None
+        return filterset.qs.values('pk')
+
+    @staticmethod
+    def titles(selected):
+        if selected is None:
+            return Title.objects.all()
+        return Title.objects.filter(pk__in=selected)
+
+    @cached_property
+    def counters(self):
+        """Все ненулевые счётчики FacetCount одним запросом."""
+        counters = {FACET_GENRE: {}, FACET_CATEGORY: {}, FACET_YEAR: {}}
+        rows = FacetCount.objects.filter(count__gt=0).values_list(
+            'facet', 'value', 'count'
+        )
+        for facet, value, count in rows:
+            counters[facet][value] = count
+        return counters
+
+    def related(self, model, facet, selected):
+        """Жанры или категории с числом отобранных произведений."""
+        if selected is None:
+            counts = self.counters[facet]
+            rows = model.objects.filter(pk__in=counts).values(
+                'pk', 'slug', 'name'
+            )
+            return [
+                {'slug': row['slug'], 'name': row['name'],
+                 'count': counts[row['pk']]}
+                for row in rows.order_by('slug')
+            ]
+        return list(
+            model.objects.filter(titles__in=selected)
+            .values('slug', 'name')
+            .annotate(count=Count('titles'))
+            .order_by('slug')
+        )
+
+    def genres(self):
+        return self.related(Genre, FACET_GENRE, self.filter(FACETS['genre']))
+
+    def categories(self):
+        return self.related(
+            Category, FACET_CATEGORY, self.filter(FACETS['category'])
+        )
+
+    def years(self):
+        selected = self.filter(FACETS['year'])
+        if selected is None:
+            rows = sorted(self.counters[FACET_YEAR].items())
+        else:
+            rows = self.titles(selected).values('year').annotate(
+                count=Count('pk')
+            ).order_by('year').values_list('year', 'count')
+        return [{'year': year, 'count': count} for year, count in rows]
+
+    def to_representation(self):
+        years = self.years()
+        selected = self.filter()
+        if selected is None:
+            count = sum(item['count'] for item in years)
+        else:
+            count = self.titles(selected).count()
+        return {
+            'count': count,
+            'genre': self.genres(),
+            'category': self.categories(),
+            'year': years,
+        }
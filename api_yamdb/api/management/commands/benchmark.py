@@ -0,0 +1,161 @@
+# api_yamdb/api/management/commands/benchmark.py
+import json
+import subprocess
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from api.benchmark import HttpTransport, LocalTransport, compare, dump
+from api.benchmark import measure_serialization, run_benchmark, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон всех эндпоинтов API: пропускная способность '
+        'и задержки p50/p95/p99.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--reviews-per-title', type=int, default=10)
+        parser.add_argument('--comments-per-review', type=int, default=3)
+        parser.add_argument(
+            '--iterations', type=int, default=100,
+            help='Запросов к каждому эндпоинту после прогрева.'
+        )
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--only', nargs='*',
+            help='Прогнать только эндпоинты, в имени которых есть подстрока.'
+        )
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Сбрасывать кэш ответов перед каждым запросом.'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Адрес запущенного сервера. Данные создаются в базе из '
+                 'настроек, которую должен использовать этот сервер. '
+                 'Без параметра запросы идут через тестовый клиент во '
+                 'временную базу.'
+        )
+        parser.add_argument(
+            '--serialization', action='store_true',
+            help='Дополнительно сравнить стоимость сборки списка '
+                 'произведений сериализатором и через values().'
+        )
+        parser.add_argument(
+            '--output', help='Куда записать результаты в формате JSON.'
+        )
+        parser.add_argument(
+            '--compare', help='JSON прошлого прогона для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        baseline = self.load_baseline(options['compare'])
+
+        databases = None
+        serialization = None
+        if not options['base_url']:
+            databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = self.run(options)
+            if options['serialization']:
+                serialization = measure_serialization()
+        finally:
+            if databases is not None:
+                teardown_databases(databases, verbosity=0)
+
+        payload = {
+            'revision': self.revision(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'parameters': {
+                key: options[key] for key in (
+                    'titles', 'reviews_per_title', 'comments_per_review',
+                    'iterations', 'warmup', 'no_cache', 'base_url',
+                )
+            },
+            'results': results,
+        }
+        if serialization is not None:
+            payload['serialization'] = serialization
+        self.report(results)
+        if serialization is not None:
+            self.report_serialization(serialization)
+        if baseline is not None:
+            self.report_comparison(compare(results, baseline))
+        if options['output']:
+            dump(options['output'], payload)
+
+    @staticmethod
+    def load_baseline(path):
+        if not path:
+            return None
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+    def run(self, options):
+        data = seed(
+            titles=options['titles'],
+            reviews_per_title=options['reviews_per_title'],
+            comments_per_review=options['comments_per_review'],
+        )
+        transport = (
+            HttpTransport(options['base_url']) if options['base_url']
+            else LocalTransport()
+        )
+        # Все запросы идут от одного клиента: ограничители частоты
+        # превратили бы замер в подсчёт ответов 429.
+        with override_settings(API_THROTTLE_RATES={}):
+            return run_benchmark(
+                transport,
+                data,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                use_cache=not options['no_cache'],
+                only=options['only'],
+            )
+
+    @staticmethod
+    def revision():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"эндпоинт":<30}{"rps":>10}{"p50, мс":>10}'
+            f'{"p95, мс":>10}{"p99, мс":>10}  статусы'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["endpoint"]:<30}{row["throughput_rps"]:>10.1f}'
+                f'{row["p50_ms"]:>10.2f}{row["p95_ms"]:>10.2f}'
+                f'{row["p99_ms"]:>10.2f}  {row["statuses"]}'
+            )
+
+    def report_serialization(self, result):
+        self.stdout.write(
+            f'\nСборка JSON на 1000 произведений (всего {result["titles"]}): '
+            f'сериализатор {result["serializer_ms_per_1000"]:.1f} мс, '
+            f'values() {result["values_ms_per_1000"]:.1f} мс, '
+            f'ответы {"совпадают" if result["identical"] else "различаются"}'
+        )
+
+    def report_comparison(self, rows):
+        self.stdout.write('\nИзменение относительно прошлого прогона, %:')
+        for row in rows:
+            self.stdout.write(
+                f'{row["endpoint"]:<30}p50 {row["p50_change"]:+7.1f}  '
+                f'p95 {row["p95_change"]:+7.1f}  '
+                f'rps {row["throughput_change"]:+7.1f}'
+            )
@@ -0,0 +1,282 @@
+# api_yamdb/api/metrics.py
+"""Метрики в формате Prometheus для /metrics.
+
+Счётчики и гистограммы копятся в памяти процесса: каждый воркер
+gunicorn отдаёт только свои запросы, и Prometheus должен опрашивать
+воркеры по отдельности или суммировать ряды по экземплярам. Значения
+из базы, например очередь писем, одинаковы во всех воркерах.
+
+"""
+import threading
+from bisect import bisect_left
+
+from reviews.outbox import outbox_stats
+from .cache import response_cache
+
+TIME_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+RATIO_BUCKETS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.7, 1)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus с произвольными метками."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets=TIME_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0.0,
+                    'count': 0,
+                }
+            position = bisect_left(self.buckets, value)
+            if position < len(self.buckets):
+                series['buckets'][position] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {
+                key: {
+                    'buckets': list(value['buckets']),
+                    'sum': value['sum'],
+                    'count': value['count'],
+                }
+                for key, value in self._series.items()
+            }
+        for labels, value in sorted(series.items()):
+            cumulative = 0
+            for bound, number in zip(self.buckets, value['buckets']):
+                cumulative += number
+                yield (
+                    f'{self.name}_bucket',
+                    labels + (('le', repr(float(bound))),),
+                    cumulative
+                )
+            yield (
+                f'{self.name}_bucket',
+                labels + (('le', '+Inf'),),
+                value['count']
+            )
+            yield f'{self.name}_sum', labels, value['sum']
+            yield f'{self.name}_count', labels, value['count']
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Монотонный счётчик с метками."""
+
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            series = dict(self._series)
+        for labels, value in sorted(series.items()):
+            yield self.name, labels, value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge:
+    """Значение, которое вычисляется в момент выгрузки метрик."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, description, function):
+        self.name = name
+        self.description = description
+        self.function = function
+
+    def samples(self):
+        yield self.name, (), self.function()
+
+    def clear(self):
+        pass
+
+
+class GaugeGroup:
+    """Несколько значений из одного вызова function при выгрузке.
+
+    function возвращает словарь, а gauges — тройки (ключ словаря, имя
+    метрики, описание), так что дорогой расчёт делается один раз на
+    опрос, сколько бы метрик из него ни строилось.
+
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, function, gauges):
+        self.function = function
+        self.gauges = tuple(gauges)
+
+    def families(self):
+        values = self.function()
+        for key, name, description in self.gauges:
+            yield name, description, self.kind, [(name, (), values[key])]
+
+    def clear(self):
+        pass
+
+
+class Registry:
+    """Набор метрик процесса и их выгрузка в текстовом формате."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs):
+        return self.register(Gauge(*args, **kwargs))
+
+    def gauge_group(self, *args, **kwargs):
+        return self.register(GaugeGroup(*args, **kwargs))
+
+    @staticmethod
+    def families(metric):
+        if isinstance(metric, GaugeGroup):
+            return metric.families()
+        return [(
+            metric.name, metric.description, metric.kind, metric.samples()
+        )]
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            for family, description, kind, samples in self.families(metric):
+                lines.append(f'# HELP {family} {description}')
+                lines.append(f'# TYPE {family} {kind}')
+                for name, labels, value in samples:
+                    lines.append(f'{name}{format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'yamdb_requests_total', 'Число запросов по представлению и статусу.'
+)
+REQUEST_DURATION = registry.histogram(
+    'yamdb_request_duration_seconds', 'Полное время обработки запроса.'
+)
+VIEW_DURATION = registry.histogram(
+    'yamdb_request_app_seconds',
+    'Время представления без базы данных: логика и сериализация.'
+)
+DB_DURATION = registry.histogram(
+    'yamdb_request_db_seconds', 'Время SQL-запросов за запрос.'
+)
+RENDER_DURATION = registry.histogram(
+    'yamdb_request_render_seconds', 'Время рендеринга ответа.'
+)
+DB_QUERIES = registry.histogram(
+    'yamdb_request_queries', 'Число SQL-запросов за запрос.',
+    buckets=QUERY_BUCKETS
+)
+THROTTLED = registry.counter(
+    'yamdb_throttled_requests_total',
+    'Запросы, отклонённые ограничителем частоты, по области.'
+)
+SHED = registry.counter(
+    'yamdb_shed_requests_total',
+    'Запросы, отклонённые из-за перегрузки воркера, по причине.'
+)
+
+COMPRESSED_BYTES_IN = registry.counter(
+    'yamdb_compression_input_bytes_total',
+    'Байт тела ответа до сжатия, по представлению и кодировке.'
+)
+COMPRESSED_BYTES_OUT = registry.counter(
+    'yamdb_compression_output_bytes_total',
+    'Байт тела ответа после сжатия, по представлению и кодировке.'
+)
+COMPRESSION_RATIO = registry.histogram(
+    'yamdb_compression_ratio', 'Доля размера сжатого ответа от исходного.',
+    buckets=RATIO_BUCKETS
+)
+COMPRESSION_CPU = registry.histogram(
+    'yamdb_compression_cpu_seconds', 'Процессорное время сжатия ответа.'
+)
+COMPRESSION_SKIPPED = registry.counter(
+    'yamdb_compression_skipped_total',
+    'Ответы, отправленные без сжатия, по причине.'
+)
+
+
+def response_cache_hits():
+    return response_cache.hits
+
+
+def response_cache_misses():
+    return response_cache.misses
+
+
+registry.gauge(
+    'yamdb_response_cache_hits', 'Попадания в кэш ответов в этом процессе.',
+    response_cache_hits
+)
+registry.gauge(
+    'yamdb_response_cache_misses', 'Промахи кэша ответов в этом процессе.',
+    response_cache_misses
+)
+registry.gauge_group(outbox_stats, [
+    ('pending', 'yamdb_outbox_pending', 'Писем в очереди на отправку.'),
+    ('dead', 'yamdb_outbox_dead', 'Недоставленных писем.'),
+    ('oldest_pending_seconds', 'yamdb_outbox_oldest_pending_seconds',
+     'Возраст самого старого неотправленного письма.'),
+    ('latency_avg_seconds', 'yamdb_outbox_delivery_latency_seconds',
+     'Средняя задержка доставки писем за последний час.'),
+])
@@ -0,0 +1,393 @@
+# api_yamdb/api/middleware.py
+import hashlib
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import replica_pins
+from .metrics import COMPRESSED_BYTES_IN, COMPRESSED_BYTES_OUT
+from .metrics import COMPRESSION_CPU, COMPRESSION_RATIO, COMPRESSION_SKIPPED
+from .metrics import DB_DURATION, DB_QUERIES, RENDER_DURATION
+from .metrics import REQUEST_DURATION, REQUESTS, SHED, VIEW_DURATION
+from .routers import allow_replica_reads, restore_replica_reads
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/x-ndjson', 'application/xml', 'application/yaml',
+)
+
+
+class RequestTimings:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.render_started = None
+        self.render_finished = None
+        self.queries = 0
+        self.db = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+class PerformanceMiddleware:
+    """Считает время запроса по этапам и выгружает его в метрики.
+
+    Замеряются SQL-запросы, работа представления вместе с
+    сериализацией, рендеринг ответа и полное время. Значения
+    отдаются клиенту в заголовке Server-Timing и копятся в
+    гистограммах для /metrics с разбивкой по представлениям.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        request._timings = timings
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        total = time.perf_counter() - timings.started
+        self.record(request, response, timings, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timings = request._timings
+        timings.render_started = time.perf_counter()
+
+        def finished(response):
+            timings.render_finished = time.perf_counter()
+
+        response.add_post_render_callback(finished)
+        return response
+
+    @staticmethod
+    def get_view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match._func_path
+
+    def record(self, request, response, timings, total):
+        render = 0.0
+        if timings.render_finished is not None:
+            render = timings.render_finished - timings.render_started
+        app = 0.0
+        if timings.view_started is not None:
+            view_finished = timings.render_started or (
+                timings.started + total
+            )
+            app = max(view_finished - timings.view_started - timings.db, 0.0)
+
+        labels = {
+            'view': self.get_view_name(request),
+            'method': request.method,
+        }
+        REQUESTS.inc(status=response.status_code, **labels)
+        REQUEST_DURATION.observe(total, **labels)
+        VIEW_DURATION.observe(app, **labels)
+        DB_DURATION.observe(timings.db, **labels)
+        RENDER_DURATION.observe(render, **labels)
+        DB_QUERIES.observe(timings.queries, **labels)
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+            f'app;dur={app * 1000:.2f}',
+            f'render;dur={render * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+
+class ConcurrencyLimitMiddleware:
+    """Сразу отклоняет запросы, когда воркер перегружен.
+
+    Пока в процессе выполняется API_MAX_IN_FLIGHT_WRITES пишущих
+    запросов, новые получают 429, а при API_MAX_IN_FLIGHT запросах
+    любого вида — 503, оба с Retry-After. Записи упираются в свой
+    предел раньше, и часть потоков всегда остаётся для чтения
+    каталога. Ноль отключает предел; считаются запросы одного
+    воркера, а не всех.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self.writes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        write = request.method not in SAFE_METHODS
+        with self._lock:
+            rejected = self.reject(write)
+            if rejected is None:
+                self.in_flight += 1
+                self.writes_in_flight += write
+        if rejected is not None:
+            SHED.inc(reason=rejected)
+            return self.shed_response(rejected)
+        try:
+            return self.get_response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.writes_in_flight -= write
+
+    def reject(self, write):
+        """Причина отказа или None, если запрос можно выполнять."""
+        limit = settings.API_MAX_IN_FLIGHT
+        if limit and self.in_flight >= limit:
+            return 'overloaded'
+        limit = settings.API_MAX_IN_FLIGHT_WRITES
+        if write and limit and self.writes_in_flight >= limit:
+            return 'writes'
+        return None
+
+    @staticmethod
+    def shed_response(reason):
+        if reason == 'writes':
+            response = JsonResponse(
+                {'detail': 'Слишком много одновременных запросов на запись.'},
+                status=429
+            )
+        else:
+            response = JsonResponse(
+                {'detail': 'Сервер перегружен, повторите запрос позже.'},
+                status=503
+            )
+        response['Retry-After'] = str(settings.API_SHED_RETRY_AFTER)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает чтение с реплик и закрепляет писавших за основной базой.
+
+    Безопасные запросы читают с реплик. После успешной записи клиент
+    на REPLICA_PIN_SECONDS секунд закрепляется за основной базой, чтобы
+    видеть свои изменения, пока реплики догоняют. Клиент узнаётся по
+    cookie и по заголовку Authorization: отметка о нём хранится в
+    бэкенде API_REPLICA_PINS, общем для воркеров, если это настроено.
+
+    """
+
+    cookie_name = 'primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replicas = (
+            request.method in SAFE_METHODS and not self.is_pinned(request)
+        )
+        token = allow_replica_reads(use_replicas)
+        try:
+            response = self.get_response(request)
+        finally:
+            restore_replica_reads(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+    @staticmethod
+    def get_pin_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        digest = hashlib.md5(authorization.encode()).hexdigest()
+        return f'pin:{digest}'
+
+    def is_pinned(self, request):
+        try:
+            until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            until = 0.0
+        if until > time.time():
+            return True
+        key = self.get_pin_key(request)
+        return key is not None and replica_pins.get(key) is not None
+
+    def pin(self, request, response):
+        seconds = settings.REPLICA_PIN_SECONDS
+        if not settings.DATABASE_REPLICAS or seconds <= 0:
+            return
+        response.set_cookie(
+            self.cookie_name, f'{time.time() + seconds:.3f}',
+            max_age=seconds, httponly=True, samesite='Lax'
+        )
+        key = self.get_pin_key(request)
+        if key is not None:
+            replica_pins.set(key, True)
+
+
+def accepted_encodings(header):
+    """'gzip, br;q=0.5' → {'gzip': 1.0, 'br': 0.5}."""
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name.strip():
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+class Encoder:
+    """Потоковое сжатие тела ответа с подсчётом байт и времени CPU."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            compressor = brotli.Compressor(
+                quality=settings.API_COMPRESS_BROTLI_QUALITY
+            )
+            self._compress = compressor.process
+            self._finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(
+                settings.API_COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31
+            )
+            self._compress = compressor.compress
+            self._finish = compressor.flush
+        self.input = 0
+        self.output = 0
+        self.cpu = 0.0
+
+    def run(self, function, *args):
+        started = time.thread_time()
+        data = function(*args)
+        self.cpu += time.thread_time() - started
+        self.output += len(data)
+        return data
+
+    def compress(self, data):
+        self.input += len(data)
+        return self.run(self._compress, data)
+
+    def finish(self):
+        return self.run(self._finish)
+
+    def record(self, view):
+        labels = {'view': view, 'encoding': self.encoding}
+        COMPRESSED_BYTES_IN.inc(self.input, **labels)
+        COMPRESSED_BYTES_OUT.inc(self.output, **labels)
+        if self.input:
+            COMPRESSION_RATIO.observe(self.output / self.input, **labels)
+        COMPRESSION_CPU.observe(self.cpu, **labels)
+
+
+class CompressionMiddleware:
+    """Сжимает ответы в br или gzip по заголовку Accept-Encoding.
+
+    Сжимаются только текстовые ответы не меньше API_COMPRESS_MIN_SIZE
+    байт: на мелких выигрыш в трафике меньше задержки на сжатие.
+    Потоковые ответы сжимаются по мере выдачи, без сборки тела в
+    памяти. Сильный ETag становится слабым, так как байты тела
+    меняются. Байты до и после сжатия и время CPU копятся в метриках
+    по представлениям, пропуски — по причинам.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        view = PerformanceMiddleware.get_view_name(request)
+        reason = self.skip_reason(response)
+        encoding = None
+        if reason is None:
+            patch_vary_headers(response, ('Accept-Encoding',))
+            encoding = self.negotiate(request)
+            if encoding is None:
+                reason = 'not_accepted'
+        if reason is None:
+            reason = self.compress(response, Encoder(encoding), view)
+        if reason is not None:
+            COMPRESSION_SKIPPED.inc(view=view, reason=reason)
+        return response
+
+    @staticmethod
+    def skip_reason(response):
+        """Почему ответ нельзя сжимать, или None."""
+        if response.status_code in (204, 304):
+            return 'no_body'
+        if response.has_header('Content-Encoding'):
+            return 'encoded'
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return 'type'
+        if not response.streaming and (
+                len(response.content) < settings.API_COMPRESS_MIN_SIZE):
+            return 'small'
+        return None
+
+    @staticmethod
+    def negotiate(request):
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        best, best_quality = None, 0
+        for encoding in encodings:
+            quality = accepted.get(encoding, accepted.get('*', 0))
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, response, encoder, view):
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                response.streaming_content, encoder, view
+            )
+            del response['Content-Length']
+        else:
+            content = encoder.compress(response.content) + encoder.finish()
+            if len(content) >= encoder.input:
+                return 'no_gain'
+            encoder.record(view)
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoder.encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return None
+
+    @staticmethod
+    def compress_stream(content, encoder, view):
+        for chunk in content:
+            data = encoder.compress(chunk)
+            if data:
+                yield data
+        yield encoder.finish()
+        encoder.record(view)
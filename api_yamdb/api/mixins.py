@@ -1,4 +1,21 @@
-from rest_framework import mixins, viewsets
+import hashlib
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .cache import response_cache
+from .routers import reading_from_replicas
+from .signals import invalidate_response_cache
+from .throttling import UserThrottle
 
 
 class CreateListDestroyViewSet(
@@ -10,3 +27,302 @@ class CreateListDestroyViewSet(
     """Вьюсет для Жанра и Категории: создание, получение списка, удаление."""
 
     pass
+
+
+class BulkCreateMixin:
+    """Принимает в POST и один объект, и список объектов.
+
+    Список проверяется целиком и создаётся одной транзакцией через
+    list_serializer_class сериализатора. bulk_create не отправляет
+    сигналы, поэтому кэш ответов сбрасывается здесь.
+
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+            invalidate_response_cache()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class PurgeDestroyMixin:
+    """Удаляет объект функцией purge_function: зависимые строки — пачками.
+
+    Пачки удаляются сырыми DELETE без сигналов, поэтому кэш ответов
+    сбрасывается здесь.
+
+    """
+
+    purge_function = None
+
+    def perform_destroy(self, instance):
+        self.purge_function(instance)
+        invalidate_response_cache()
+
+
+class ThrottledCreateMixin:
+    """Ограничивает частоту создания объектов, не трогая чтение.
+
+    Область ограничителя задаёт throttle_scope вьюсета.
+
+    """
+
+    create_throttle_classes = (UserThrottle,)
+
+    def get_throttles(self):
+        if self.request.method == 'POST':
+            return [throttle() for throttle in self.create_throttle_classes]
+        return super().get_throttles()
+
+
+class CursorPaginationMixin:
+    """Включает пагинацию по курсору по запросу клиента.
+
+    Режим выбирается параметром ?pagination=cursor, дальше клиент
+    переходит по ссылкам next/previous с параметром cursor.
+    Без параметра остаётся пагинация из настроек.
+
+    """
+
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return self.cursor_pagination_class is not None and (
+            'cursor' in params or params.get('pagination') == 'cursor'
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+class CachedResponseMixin:
+    """Отдаёт сохранённые ответы на чтение из кэша каталога."""
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = response_cache.make_key(request)
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and (
+                not self.may_be_stale()):
+            response_cache.set(key, response.data)
+        return response
+
+    @staticmethod
+    def may_be_stale():
+        """Ответ с реплики вскоре после записи мог не увидеть изменений."""
+        if not reading_from_replicas():
+            return False
+        elapsed = time.time() - response_cache.invalidated_at()
+        return elapsed < settings.REPLICA_PIN_SECONDS
+
+
+class CachedListMixin(CachedResponseMixin):
+    """Кэширует ответы на запрос списка."""
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Кэширует ответы на запрос одного объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на условные запросы чтения без сериализации.
+
+    Валидатор считается одним запросом по полю modified: для объекта
+    это время его изменения, для списка — максимальное время и число
+    строк после фильтрации. Last-Modified отдаётся только для объекта:
+    удаление из списка не сдвигает максимум, его замечает лишь ETag.
+
+    """
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def make_etag(self, request, *parts):
+        raw = '|'.join(
+            (request.accepted_media_type or '', request.get_full_path())
+            + tuple(str(part) for part in parts)
+        )
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def conditional_response(self, handler, request, etag, modified,
+                             *args, **kwargs):
+        etag = quote_etag(etag)
+        headers = {'ETag': etag}
+        last_modified = None
+        if modified is not None:
+            last_modified = int(modified.timestamp())
+            headers['Last-Modified'] = http_date(last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validator = self.get_validator_queryset().order_by().aggregate(
+            modified=Max('modified'), count=Count('pk')
+        )
+        if not validator['count']:
+            return super().list(request, *args, **kwargs)
+        etag = self.make_etag(
+            request, validator['modified'].isoformat(), validator['count']
+        )
+        return self.conditional_response(
+            super().list, request, etag, None, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        modified = self.get_validator_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values_list('modified', flat=True).first()
+        if modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = self.make_etag(request, modified.isoformat())
+        return self.conditional_response(
+            super().retrieve, request, etag, modified, *args, **kwargs
+        )
+
+
+def split_fields(value):
+    """'id, name' → {'id', 'name'}."""
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Отдаёт только поля из ?fields= или все, кроме перечисленных в ?omit=.
+
+    sparse_columns сопоставляет полю ответа столбцы модели, в том
+    числе через связь (author__username). Ненужные поля убираются из
+    сериализатора, а их столбцы — из запроса: only() их не читает,
+    select_related не присоединяет лишние таблицы. Параметры действуют
+    только на чтение, неизвестное поле — ошибка 400.
+
+    """
+
+    sparse_columns = {}
+
+    def get_sparse_fields(self):
+        """Запрошенные поля в порядке sparse_columns или None."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = request.query_params
+        if 'fields' not in params and 'omit' not in params:
+            return None
+        available = set(self.sparse_columns)
+        requested = split_fields(params.get('fields')) or available
+        omitted = split_fields(params.get('omit'))
+        unknown = (requested | omitted) - available
+        if unknown:
+            raise ValidationError({
+                'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+            })
+        return tuple(
+            name for name in self.sparse_columns
+            if name in requested and name not in omitted
+        )
+
+    def get_sparse_required(self):
+        """Столбцы, которые читаются всегда: id и порядок курсора."""
+        required = ['id']
+        pagination = getattr(self, 'cursor_pagination_class', None)
+        if pagination is not None:
+            required.extend(field.lstrip('-') for field in pagination.ordering)
+        return tuple(dict.fromkeys(required))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = [
+            column for name in fields for column in self.sparse_columns[name]
+        ]
+        relations = {
+            column.rpartition('__')[0] for column in columns if '__' in column
+        }
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*self.get_sparse_required(), *columns)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            child = getattr(serializer, 'child', serializer)
+            for name in set(child.fields) - set(fields):
+                child.fields.pop(name)
+        return serializer
+
+
+class ValuesReadMixin:
+    """Отдаёт список и объект через reader, минуя сериализатор.
+
+    reader строит ответ из values(); сериализатор по-прежнему
+    используется для записи и описания полей.
+
+    """
+
+    reader_class = None
+
+    def get_reader(self):
+        return self.reader_class()
+
+    def get_values_queryset(self):
+        return self.get_reader().values(
+            self.filter_queryset(self.get_queryset())
+        )
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        queryset = self.get_values_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                reader.to_representation(page)
+            )
+        return Response(reader.to_representation(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.get_values_queryset(),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        return Response(self.get_reader().to_representation([row])[0])
@@ -0,0 +1,20 @@
+# api_yamdb/api/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class TitleCursorPagination(CursorPagination):
+    """Постраничный вывод произведений по курсору."""
+
+    ordering = ('name', 'id')
+
+
+class ReviewCursorPagination(CursorPagination):
+    """Постраничный вывод отзывов по курсору."""
+
+    ordering = ('pub_date', 'id')
+
+
+class CommentCursorPagination(CursorPagination):
+    """Постраничный вывод комментариев по курсору."""
+
+    ordering = ('pub_date', 'id')
@@ -0,0 +1,17 @@
+# api_yamdb/api/renderers.py
+from rest_framework.renderers import BaseRenderer
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Текстовый формат выгрузки метрик Prometheus."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return '\n'.join(
+            f'{key}: {value}' for key, value in data.items()
+        ).encode(self.charset)
@@ -0,0 +1,52 @@
+# api_yamdb/api/routers.py
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# Модель таблицы DatabaseCache: кэш читается там же, куда пишется.
+CACHE_APP_LABEL = 'django_cache'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def allow_replica_reads(allowed=True):
+    """Разрешает чтение с реплик в текущем контексте; возвращает токен."""
+    return _replica_reads.set(allowed)
+
+
+def restore_replica_reads(token):
+    _replica_reads.reset(token)
+
+
+def reading_from_replicas():
+    return bool(settings.DATABASE_REPLICAS) and _replica_reads.get()
+
+
+class ReplicaRouter:
+    """Направляет чтение на реплики, а запись — на основную базу.
+
+    Реплики используются, только если это явно разрешено в текущем
+    контексте: ReplicaRoutingMiddleware делает это для безопасных
+    запросов. Команды, shell и пишущие запросы читают с основной базы,
+    поэтому select_for_update и чтение перед записью не уходят на
+    отстающую реплику.
+
+    """
+
+    def db_for_read(self, model, **hints):
+        if not reading_from_replicas():
+            return PRIMARY
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return PRIMARY
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -1,11 +1,176 @@
 # api_yamdb/api/serializers.py
 from django.contrib.auth.base_user import BaseUserManager
+from django.db.models import prefetch_related_objects
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+from reviews.exporter import FORMATS
+from reviews.facets import count_genres, count_titles
 from reviews.models import AUTH_USER, Category, ROLES_CHOICES, Comment
 from reviews.models import Genre, Review, Title, User
 
 
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, берущий объекты из словаря, загруженного заранее.
+
+    Словарь заполняет BulkListSerializer одним запросом на всю пачку;
+    при записи одного объекта поле работает как обычно.
+
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.objects = None
+
+    def preload(self, slugs):
+        self.objects = {
+            getattr(instance, self.slug_field): instance
+            for instance in self.get_queryset().filter(
+                **{f'{self.slug_field}__in': slugs}
+            )
+        }
+
+    def to_internal_value(self, data):
+        if self.objects is None:
+            return super().to_internal_value(data)
+        try:
+            return self.objects[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        except TypeError:
+            self.fail('invalid')
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Пакетное создание объектов из списка в одном запросе.
+
+    Слаги связанных объектов и уникальные поля проверяются одним
+    запросом IN на всю пачку, строки вставляются через bulk_create,
+    связи многие-ко-многим — одним bulk_create в промежуточную
+    таблицу. Ошибки возвращаются списком по позициям элементов.
+
+    """
+
+    max_items = 1000
+
+    def relation_fields(self):
+        for name, field in self.child.fields.items():
+            if isinstance(field, serializers.ManyRelatedField):
+                field = field.child_relation
+            if isinstance(field, BulkSlugRelatedField):
+                yield name, field
+
+    def unique_fields(self):
+        for name, field in self.child.fields.items():
+            validators = [
+                validator for validator in field.validators
+                if isinstance(validator, UniqueValidator)
+            ]
+            if validators:
+                yield name, field, validators[0]
+
+    @staticmethod
+    def raw_values(data, name):
+        for item in data:
+            value = item.get(name) if isinstance(item, dict) else None
+            values = value if isinstance(value, list) else [value]
+            for value in values:
+                if isinstance(value, str):
+                    yield value
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        if len(data) > self.max_items:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Не больше {self.max_items} объектов за запрос.'
+                ]
+            })
+        for name, field in self.relation_fields():
+            field.preload(set(self.raw_values(data, name)))
+        unique = list(self.unique_fields())
+        for name, field, validator in unique:
+            field.validators = [
+                item for item in field.validators if item is not validator
+            ]
+        validated = []
+        errors = []
+        for item in data:
+            try:
+                validated.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as error:
+                validated.append(None)
+                errors.append(error.detail)
+        for name, field, validator in unique:
+            self.check_unique(name, validator, validated, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def check_unique(self, name, validator, validated, errors):
+        """Проверяет уникальность поля по базе и внутри пачки."""
+        values = [item[name] for item in validated if item and name in item]
+        taken = set(
+            validator.queryset.filter(**{f'{name}__in': values})
+            .values_list(name, flat=True)
+        )
+        for item, item_errors in zip(validated, errors):
+            if not item or name not in item:
+                continue
+            if item[name] in taken:
+                item_errors.setdefault(name, []).append(validator.message)
+            taken.add(item[name])
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        relations = {
+            field.name: field for field in model._meta.many_to_many
+            if any(field.name in item for item in validated_data)
+        }
+        instances = model.objects.bulk_create(
+            model(**{
+                key: value for key, value in item.items()
+                if key not in relations
+            })
+            for item in validated_data
+        )
+        for name, field in relations.items():
+            through = field.remote_field.through
+            through.objects.bulk_create(
+                through(**{
+                    field.m2m_field_name(): instance,
+                    field.m2m_reverse_field_name(): related,
+                })
+                for instance, item in zip(instances, validated_data)
+                for related in dict.fromkeys(item.get(name, ()))
+            )
+        prefetch_related_objects(instances, *relations)
+        return instances
+
+
+class TitleBulkListSerializer(BulkListSerializer):
+    """Пакетное создание произведений со счётчиками фасетов.
+
+    bulk_create не отправляет сигналов, поэтому категории, годы и
+    жанры новых произведений учитываются здесь же.
+
+    """
+
+    def create(self, validated_data):
+        instances = super().create(validated_data)
+        count_titles(instances)
+        count_genres(
+            genre.pk for instance in instances
+            for genre in instance.genre.all()
+        )
+        return instances
+
+
 class SignupSerializer(serializers.ModelSerializer):
     """Самостоятельная регистрация пользователей."""
 
@@ -109,6 +274,7 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id',)
         lookup_field = 'slug'
         model = Category
+        list_serializer_class = BulkListSerializer
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -118,6 +284,7 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
         lookup_field = 'slug'
         model = Genre
+        list_serializer_class = BulkListSerializer
 
 
 class TitleReadSerializer(serializers.ModelSerializer):
@@ -128,26 +295,46 @@ class TitleReadSerializer(serializers.ModelSerializer):
     rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('score_sum', 'reviews_count', 'trending_score', 'modified')
         model = Title
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Изменение данных произведений."""
 
-    category = serializers.SlugRelatedField(
+    category = BulkSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = (
+            'score_sum', 'reviews_count', 'rating', 'trending_score',
+            'modified'
+        )
         model = Title
+        list_serializer_class = TitleBulkListSerializer
+
+
+class LeaderboardParamsSerializer(serializers.Serializer):
+    """Параметры запроса рейтингов произведений."""
+
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    """Параметры потоковой выгрузки."""
+
+    output = serializers.ChoiceField(choices=FORMATS, default='ndjson')
+    after_id = serializers.IntegerField(min_value=0, required=False)
+    since = serializers.DateTimeField(required=False)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -156,12 +343,14 @@ class ReviewSerializer(serializers.ModelSerializer):
     score = serializers.IntegerField(min_value=1, max_value=10)
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username')
-    title = serializers.SlugRelatedField(
-        read_only=True, slug_field='id')
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date', 'title')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'title',
+            'comments_count', 'last_comment_at',
+        )
 
     def validate(self, data):
         if self.context['request'].method != 'POST':
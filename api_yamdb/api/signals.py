@@ -0,0 +1,37 @@
+# api_yamdb/api/signals.py
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from reviews.models import Category, Genre, Review, Title, User
+from .authentication import invalidate_cached_user
+from .db import close_unusable_connections
+from .cache import response_cache
+
+
+def invalidate_response_cache(**kwargs):
+    """Сбрасывает кэш каталога после фиксации транзакции."""
+    transaction.on_commit(response_cache.invalidate)
+
+
+for model in (Category, Genre, Title, Review):
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+m2m_changed.connect(invalidate_response_cache, sender=Title.genre.through)
+
+
+def invalidate_user(sender, instance, **kwargs):
+    """Вытесняет пользователя из кэша аутентификации.
+
+    Запись удаляется сразу и ещё раз после фиксации транзакции,
+    чтобы параллельный запрос не закэшировал прежнюю роль.
+
+    """
+    invalidate_cached_user(instance.pk)
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
+
+
+post_save.connect(invalidate_user, sender=User)
+post_delete.connect(invalidate_user, sender=User)
+
+request_started.connect(close_unusable_connections)
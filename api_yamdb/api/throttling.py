@@ -0,0 +1,187 @@
+# api_yamdb/api/throttling.py
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+
+from django.conf import settings
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+from rest_framework.throttling import BaseThrottle
+
+from reviews.models import ThrottleBucket
+from .cache import load_backend
+from .metrics import THROTTLED
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' → (ёмкость 10, пополнение токенов в секунду)."""
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / PERIODS[period.strip()[0]]
+
+
+class LocMemBuckets:
+    """Корзины токенов в памяти процесса.
+
+    Самый быстрый вариант, но у каждого воркера свои корзины: при
+    N воркерах клиент получает до N раз больше запросов.
+
+    """
+
+    def __init__(self, max_entries=10000, **kwargs):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        """Берёт токен; возвращает 0 или сколько секунд ждать до него."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBuckets:
+    """Общие для всех воркеров корзины токенов в таблице ThrottleBucket.
+
+    Корзина пополняется и списывается одним INSERT ... ON CONFLICT по
+    часам базы, поэтому параллельные запросы из разных воркеров не
+    теряют списаний. Полные корзины раз в purge_every вызовов
+    удаляются: отсутствующая строка и есть полная корзина.
+
+    """
+
+    def __init__(self, alias='default', purge_every=1000, **kwargs):
+        self.alias = alias
+        self.purge_every = purge_every
+        self._calls = count(1)
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    @property
+    def table(self):
+        return self.connection.ops.quote_name(ThrottleBucket._meta.db_table)
+
+    def consume(self, key, capacity, rate):
+        table = self.table
+        refill = (
+            f'LEAST(%(capacity)s, {table}.tokens + '
+            f'(EXCLUDED.updated - {table}.updated) * %(rate)s)'
+        )
+        tokens = f'CASE WHEN {refill} >= 1 THEN {refill} - 1 ELSE {refill} END'
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} '
+                f'(key, tokens, updated, full_at, allowed) '
+                f'VALUES (%(key)s, %(capacity)s - 1, '
+                f'extract(epoch FROM clock_timestamp()), '
+                f'extract(epoch FROM clock_timestamp()) + 1 / %(rate)s, '
+                f'true) '
+                f'ON CONFLICT (key) DO UPDATE SET '
+                f'tokens = {tokens}, '
+                f'allowed = {refill} >= 1, '
+                f'updated = EXCLUDED.updated, '
+                f'full_at = EXCLUDED.updated '
+                f'+ (%(capacity)s - ({tokens})) / %(rate)s '
+                f'RETURNING tokens, allowed',
+                {'key': key, 'capacity': float(capacity), 'rate': rate}
+            )
+            tokens, allowed = cursor.fetchone()
+        if next(self._calls) % self.purge_every == 0:
+            self.purge()
+        return 0.0 if allowed else (1 - tokens) / rate
+
+    def purge(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} '
+                f'WHERE full_at < extract(epoch FROM clock_timestamp())'
+            )
+
+    def clear(self):
+        ThrottleBucket.objects.using(self.alias).all().delete()
+
+
+throttle_buckets = SimpleLazyObject(
+    lambda: load_backend(settings.API_THROTTLE_BUCKETS)
+)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты запросов корзиной токенов.
+
+    Частота берётся из API_THROTTLE_RATES по области: атрибуту scope
+    ограничителя или throttle_scope представления. Корзина пополняется
+    равномерно, так что после всплеска запросы снова проходят по мере
+    накопления токенов, а не в начале следующего окна.
+
+    """
+
+    scope = None
+    kind = None
+
+    def get_scope(self, view):
+        return self.scope or getattr(view, 'throttle_scope', None)
+
+    def get_client(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        rate = settings.API_THROTTLE_RATES.get(scope)
+        self._wait = 0.0
+        if not rate:
+            return True
+        capacity, refill = parse_rate(rate)
+        key = f'throttle:{scope}:{self.get_client(request)}'
+        self._wait = throttle_buckets.consume(key, capacity, refill)
+        if self._wait:
+            THROTTLED.inc(scope=scope, kind=self.kind)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина на каждый IP-адрес клиента."""
+
+    kind = 'ip'
+
+    def get_client(self, request):
+        return f'ip:{self.get_ident(request)}'
+
+
+class UserThrottle(TokenBucketThrottle):
+    """Корзина на пользователя, для анонимов — на IP-адрес."""
+
+    kind = 'user'
+
+    def get_client(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+
+class TokenThrottle(IPThrottle):
+    """Получение токена: у функции-представления нет throttle_scope."""
+
+    scope = 'token'
@@ -3,6 +3,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import APISignup, auth_token, CategoryViewSet, CommentViewSet
+from .views import ExportView
 from .views import GenreViewSet, ReviewViewSet, TitleViewSet
 from .views import user_detail, user_list, user_me
 
@@ -35,5 +36,6 @@ users_patterns = [
 urlpatterns = [
     path('v1/auth/', include(auth_patterns)),
     path('v1/users/', include(users_patterns)),
+    path('v1/export/<str:dataset>/', ExportView.as_view(), name='export'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,29 +1,51 @@
 # api_yamdb/api/views.py
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import router, transaction
+from django.http import Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import throttle_classes
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from reviews.exporter import EXPORTS, Exporter
 from reviews.filters import TitlesFilters
 from reviews.models import Category, Comment, Genre, Review, Title, User
-from .mixins import CreateListDestroyViewSet
+from reviews.outbox import queue_email
+from reviews.purge import purge_review, purge_title, purge_user
+from reviews.ratings import leaderboard
+from .facets import TitleFacets
+from .metrics import registry
+from .mixins import BulkCreateMixin, CachedListMixin, CachedRetrieveMixin
+from .mixins import ConditionalGetMixin, ValuesReadMixin
+from .mixins import CreateListDestroyViewSet, CursorPaginationMixin
+from .mixins import PurgeDestroyMixin, SparseFieldsMixin
+from .mixins import ThrottledCreateMixin
+from .pagination import CommentCursorPagination, ReviewCursorPagination
+from .pagination import TitleCursorPagination
 from .permissions import (
     AdminPermission,
     IsAdminOrReadOnly,
     IsAuthorOrAdminOrModeratorOrReadOnly
 )
+from .readers import TitleReader, ordered_genres
+from .renderers import PrometheusRenderer
 from .serializers import AdminSerializer, CategorySerializer, GenreSerializer
-from .serializers import CommentSerializer, GetConfirmationCodeSerializer
+from .serializers import CommentSerializer, ExportParamsSerializer
+from .serializers import GetConfirmationCodeSerializer
+from .serializers import LeaderboardParamsSerializer
 from .serializers import MeSerializer, ReviewSerializer, SignupSerializer
 from .serializers import TitleReadSerializer, TitleWriteSerializer
 from .serializers import TokenSerializer
+from .throttling import IPThrottle, TokenThrottle
 
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
 GET_POST_USER_LIST = {'get': 'list',
                       'post': 'create'
                       }
@@ -40,20 +62,15 @@ class APISignup(APIView):
     """Самостоятельная регистрация пользователей."""
 
     permission_classes = [permissions.AllowAny]
+    throttle_classes = (IPThrottle,)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignupSerializer(data=request.data,)
         if serializer.is_valid():
-            serializer.save()
-            username = serializer.data['username']
-            email = serializer.data['email']
-            user = get_object_or_404(User, username=username)
-            confirmation_code = user.confirmation_code
-            send_mail('Код подтверждения',
-                      f'{confirmation_code}',
-                      'yamdb.com',
-                      [f'{email}']
-                      )
+            with transaction.atomic():
+                user = serializer.save()
+                send_confirmation_code(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -62,20 +79,22 @@ class APISignup(APIView):
         serializer = GetConfirmationCodeSerializer(user, data=request.data,
                                                    partial=True)
         if serializer.is_valid():
-            serializer.save()
-            username = serializer.data['username']
-            email = serializer.data['email']
-            user = get_object_or_404(User, username=username)
-            confirmation_code = user.confirmation_code
-            send_mail('Код подтверждения',
-                      f'{confirmation_code}',
-                      'yamdb.com',
-                      [f'{email}']
-                      )
+            with transaction.atomic():
+                user = serializer.save()
+                send_confirmation_code(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def send_confirmation_code(user):
+    """Ставит письмо с кодом подтверждения в очередь отправки."""
+    queue_email('Код подтверждения',
+                f'{user.confirmation_code}',
+                'yamdb.com',
+                f'{user.email}'
+                )
+
+
 def get_tokens_for_user(user):
     """Получение токена."""
     refresh = RefreshToken.for_user(user)
@@ -89,6 +108,7 @@ def get_tokens_for_user(user):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenThrottle])
 def auth_token(request):
     """Получение токена пользователем."""
     serializer = TokenSerializer(data=request.data)
@@ -99,7 +119,45 @@ def auth_token(request):
         return Response(token, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class MetricsView(APIView):
+    """Метрики производительности процесса для Prometheus."""
+
+    permission_classes = (AdminPermission,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(registry.render())
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов или комментариев."""
+
+    permission_classes = (AdminPermission,)
+
+    def get(self, request, dataset):
+        if dataset not in EXPORTS:
+            raise Http404
+        params = ExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        output = params.validated_data['output']
+        model = EXPORTS[dataset][0]
+        exporter = Exporter(dataset, using=router.db_for_read(model))
+        response = StreamingHttpResponse(
+            exporter.export(
+                output,
+                after_id=params.validated_data.get('after_id'),
+                since=params.validated_data.get('since')
+            ),
+            content_type=EXPORT_CONTENT_TYPES[output]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output}"'
+        )
+        return response
+
+
+class UserViewSet(PurgeDestroyMixin, SparseFieldsMixin,
+                  viewsets.ModelViewSet):
     """Работа администратора с пользователями."""
 
     queryset = User.objects.all()
@@ -108,6 +166,15 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     lookup_field = "username"
+    purge_function = staticmethod(purge_user)
+    sparse_columns = {
+        'username': ('username',),
+        'email': ('email',),
+        'first_name': ('first_name',),
+        'last_name': ('last_name',),
+        'bio': ('bio',),
+        'role': ('role',),
+    }
 
 
 user_list = UserViewSet.as_view(GET_POST_USER_LIST)
@@ -142,7 +209,8 @@ class MeViewSet(viewsets.ModelViewSet):
 user_me = MeViewSet.as_view(GET_PATCH__USER_ME)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(BulkCreateMixin, CachedListMixin,
+                      CreateListDestroyViewSet):
     """Работает со списком категорий."""
 
     queryset = Category.objects.all()
@@ -157,7 +225,8 @@ class CategoryViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(BulkCreateMixin, CachedListMixin,
+                   CreateListDestroyViewSet):
     """Работает со списком жанров."""
 
     queryset = Genre.objects.all()
@@ -172,37 +241,106 @@ class GenreViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(BulkCreateMixin, ConditionalGetMixin, CachedListMixin,
+                   CachedRetrieveMixin, CursorPaginationMixin,
+                   PurgeDestroyMixin, SparseFieldsMixin, ValuesReadMixin,
+                   viewsets.ModelViewSet):
     """Работает со списком произведений."""
 
-    queryset = Title.objects.prefetch_related(
-        'category', 'genre').annotate(
-            rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category').prefetch_related(ordered_genres())
     permission_classes = (
         IsAdminOrReadOnly,
     )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilters
+    cursor_pagination_class = TitleCursorPagination
+    reader_class = TitleReader
+    purge_function = staticmethod(purge_title)
+    sparse_columns = TitleReader.fields
+
+    def get_reader(self):
+        return self.reader_class(
+            self.get_sparse_fields(), self.get_sparse_required()
+        )
 
     def get_serializer_class(self):
         if self.action == 'list' or self.action == 'retrieve':
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, pagination_class=None)
+    def facets(self, request):
+        """Число произведений по значениям фильтров одним запросом."""
+        return self.get_cached_response(self.build_facets, request)
+
+    def build_facets(self, request):
+        facets = TitleFacets(self.filterset_class, request.query_params)
+        return Response(facets.to_representation())
+
+    @action(detail=False, pagination_class=None)
+    def top(self, request):
+        """Произведения с наибольшим рейтингом."""
+        return self.get_cached_response(
+            self.build_leaderboard, request, board='top'
+        )
+
+    @action(detail=False, pagination_class=None)
+    def trending(self, request):
+        """Произведения, о которых больше всего пишут в последнее время."""
+        return self.get_cached_response(
+            self.build_leaderboard, request, board='trending'
+        )
+
+    def build_leaderboard(self, request, board):
+        params = LeaderboardParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        reader = self.get_reader()
+        queryset = leaderboard(
+            board,
+            genre=params.validated_data.get('genre'),
+            category=params.validated_data.get('category')
+        )
+        rows = reader.values(queryset)[:params.validated_data['limit']]
+        return Response(reader.to_representation(rows))
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ThrottledCreateMixin, ConditionalGetMixin,
+                    CursorPaginationMixin, PurgeDestroyMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
     """Обрабатывает отзывы к произведениям."""
 
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthorOrAdminOrModeratorOrReadOnly,
     )
+    cursor_pagination_class = ReviewCursorPagination
+    throttle_scope = 'review'
+    purge_function = staticmethod(purge_review)
+    sparse_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'title': ('title',),
+        'comments_count': ('comments_count',),
+        'last_comment_at': ('last_comment_at',),
+    }
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return Review.objects.filter(title=self.get_title())
+        return Review.objects.filter(
+            title=self.get_title()).select_related('author')
+
+    def get_validator_queryset(self):
+        return Review.objects.filter(title_id=self.kwargs.get('title_id'))
 
     def perform_create(self, serializer):
         serializer.save(
@@ -211,19 +349,38 @@ class ReviewViewSet(viewsets.ModelViewSet):
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ThrottledCreateMixin, ConditionalGetMixin,
+                     CursorPaginationMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     """Обрабатывает комментарии к отзывам на произведения."""
 
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthorOrAdminOrModeratorOrReadOnly,
     )
+    cursor_pagination_class = CommentCursorPagination
+    throttle_scope = 'comment'
+    sparse_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+        'review': ('review',),
+    }
 
     def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, pk=self.kwargs.get('review_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        return Comment.objects.filter(review=self.get_review())
+        return Comment.objects.filter(
+            review=self.get_review()).select_related('author')
+
+    def get_validator_queryset(self):
+        return Comment.objects.filter(review_id=self.kwargs.get('review_id'))
 
     def perform_create(self, serializer):
         serializer.save(
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'reviews.apps.ReviewsConfig',
@@ -30,6 +31,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.PerformanceMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'api.middleware.ConcurrencyLimitMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,10 +75,27 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', default='true').lower() == 'true',
     }
 }
 
+# Реплики для чтения: хосты через пробел, остальные параметры — как у default.
+DATABASE_REPLICAS = []
+for number, host in enumerate(os.getenv('DB_REPLICA_HOSTS', default='').split()):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', default=5))
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -108,7 +130,11 @@ USE_TZ = False
 # Static files (CSS, JavaScript, Images)
 
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# Исходники статики лежат в static/, collectstatic собирает их в STATIC_ROOT
+# с хэшем содержимого в именах и сжатыми копиями для nginx.
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.getenv('STATIC_ROOT', default=os.path.join(BASE_DIR, 'collected_static'))
+STATICFILES_STORAGE = 'api_yamdb.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 AUTH_USER_MODEL = 'reviews.User'
@@ -120,12 +146,90 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
+    # Адрес клиента берётся из X-Forwarded-For, который выставляет nginx.
+    'NUM_PROXIES': int(os.getenv('API_NUM_PROXIES', default=1)),
+}
+
+# Общий для всех воркеров кэш: по умолчанию таблица в базе (manage.py createcachetable),
+# в CACHE_BACKEND можно указать memcached или redis.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='django_cache'),
+    }
+}
+
+# Тела ответов — в памяти воркера, версия кэша — в общем кэше, чтобы запись
+# через любой воркер сбрасывала кэш всех остальных.
+API_RESPONSE_CACHE = {
+    'BACKEND': os.getenv('API_CACHE_BACKEND', default='api.cache.LocMemBackend'),
+    'OPTIONS': {
+        'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', default=1000)),
+        'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', default=60)),
+    },
+    'VERSIONS': {
+        'BACKEND': os.getenv('API_CACHE_VERSIONS_BACKEND', default='api.cache.DjangoCacheBackend'),
+        'OPTIONS': {
+            'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', default=60)),
+            'PREFIX': 'response',
+        },
+    },
 }
 
+# Пользователи для JWT-аутентификации кэшируются в общем кэше: смена роли или удаление
+# через любой воркер сразу видны всем. gunicorn не запустит несколько воркеров
+# с этим кэшем в памяти процесса (api.cache.check_shared_backends).
+API_USER_CACHE = {
+    'BACKEND': os.getenv('API_USER_CACHE_BACKEND', default='api.cache.DjangoCacheBackend'),
+    'OPTIONS': {
+        'MAX_ENTRIES': int(os.getenv('API_USER_CACHE_MAX_ENTRIES', default=10000)),
+        'TIMEOUT': int(os.getenv('API_USER_CACHE_TIMEOUT', default=30)),
+        'PREFIX': 'auth',
+    },
+}
+
+API_REPLICA_PINS = {
+    'BACKEND': os.getenv('API_REPLICA_PINS_BACKEND', default='api.cache.LocMemBackend'),
+    'OPTIONS': {
+        'MAX_ENTRIES': 10000,
+        'TIMEOUT': REPLICA_PIN_SECONDS,
+        'PREFIX': 'replica',
+    },
+}
+
+# Корзины токенов ограничителей частоты: в памяти воркера или общие в базе
+# (api.throttling.DatabaseBuckets). Частота — «число/период», пустая строка отключает.
+API_THROTTLE_BUCKETS = {
+    'BACKEND': os.getenv('API_THROTTLE_BACKEND', default='api.throttling.LocMemBuckets'),
+    'OPTIONS': {
+        'MAX_ENTRIES': 10000,
+    },
+}
+
+API_THROTTLE_RATES = {
+    'signup': os.getenv('API_THROTTLE_SIGNUP', default='5/min'),
+    'token': os.getenv('API_THROTTLE_TOKEN', default='10/min'),
+    'review': os.getenv('API_THROTTLE_REVIEW', default='10/min'),
+    'comment': os.getenv('API_THROTTLE_COMMENT', default='30/min'),
+}
+
+# Пределы одновременных запросов в одном воркере, 0 отключает предел.
+API_MAX_IN_FLIGHT = int(os.getenv('API_MAX_IN_FLIGHT', default=0))
+API_MAX_IN_FLIGHT_WRITES = int(os.getenv('API_MAX_IN_FLIGHT_WRITES', default=2))
+API_SHED_RETRY_AFTER = int(os.getenv('API_SHED_RETRY_AFTER', default=1))
+
+# Сжатие ответов: меньшие тела отдаются как есть, br — если установлен Brotli.
+API_COMPRESS_MIN_SIZE = int(os.getenv('API_COMPRESS_MIN_SIZE', default=1024))
+API_COMPRESS_GZIP_LEVEL = int(os.getenv('API_COMPRESS_GZIP_LEVEL', default=6))
+API_COMPRESS_BROTLI_QUALITY = int(os.getenv('API_COMPRESS_BROTLI_QUALITY', default=4))
+
+# Период полураспада популярности: вклад отзыва вдвое меньше через столько часов.
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', default=72))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=100),
     'AUTH_HEADER_TYPES': ('Bearer',)
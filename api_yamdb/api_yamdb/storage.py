@@ -0,0 +1,70 @@
+# api_yamdb/api_yamdb/storage.py
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Сжимать есть смысл только текст: картинки и шрифты уже сжаты.
+COMPRESSIBLE = (
+    '.css', '.js', '.json', '.yaml', '.yml', '.svg', '.html', '.txt',
+    '.xml', '.map', '.ico', '.eot', '.ttf',
+)
+
+
+def gzip_compress(data):
+    # mtime=0: одинаковые файлы дают одинаковые архивы при каждой сборке.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и готовыми .gz и .br рядом.
+
+    collectstatic кладёт каждый файл под исходным именем и под именем
+    с хэшем, а затем пишет сжатые варианты, которые nginx отдаёт без
+    сжатия на лету. Файл с хэшем в имени никогда не меняется, поэтому
+    его можно кэшировать навсегда. Brotli пишется, только если
+    установлен пакет brotli; файлы меньше min_size и варианты, не
+    ставшие меньше оригинала, пропускаются.
+
+    """
+
+    min_size = 256
+
+    def compressors(self):
+        yield '.gz', gzip_compress
+        if brotli is not None:
+            yield '.br', brotli.compress
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set(paths)
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                names.add(hashed_name)
+            yield name, hashed_name, processed
+        if not dry_run:
+            # Сжимаем после всех проходов: CSS с url() переписывается
+            # несколько раз, и только последний вариант окончательный.
+            for name in sorted(names):
+                self.compress(name)
+
+    def compress(self, name):
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE:
+            return
+        with self.open(name) as source:
+            data = source.read()
+        if len(data) < self.min_size:
+            return
+        for suffix, compressor in self.compressors():
+            compressed = compressor(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
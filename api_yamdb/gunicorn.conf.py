@@ -0,0 +1,44 @@
+# api_yamdb/gunicorn.conf.py
+"""Настройки gunicorn для продакшена.
+
+Каждое значение можно переопределить переменной окружения
+с префиксом GUNICORN_. Приложение загружается до форка, поэтому
+соединения с базой, открытые при импорте, закрываются в post_fork.
+
+"""
+import multiprocessing
+import os
+
+CPU_COUNT = multiprocessing.cpu_count()
+
+# Каталог с manage.py: модуль api_yamdb.wsgi ищется относительно него.
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+# Воркеры — по процессам на ядро, потоки закрывают ожидание базы.
+workers = int(os.getenv('GUNICORN_WORKERS', CPU_COUNT * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Перезапуск воркера после max_requests запросов ограничивает рост
+# памяти; разброс не даёт всем воркерам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def on_starting(server):
+    # Кэши в памяти процесса не видят изменений из соседних воркеров.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from api.cache import check_shared_backends
+    check_shared_backends(server.cfg.workers)
+
+
+def post_fork(server, worker):
+    from django.db import connections
+    connections.close_all()
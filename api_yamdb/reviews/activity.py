@@ -0,0 +1,79 @@
+# api_yamdb/reviews/activity.py
+from django.db.models import Count, DateTimeField, F, IntegerField, Max
+from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from reviews.models import Comment, Review
+
+
+def _comment_aggregate(aggregate, output_field):
+    return Subquery(
+        Comment.objects.filter(review=OuterRef('pk'))
+        .order_by()
+        .values('review')
+        .annotate(value=aggregate)
+        .values('value'),
+        output_field=output_field
+    )
+
+
+def _comments_count():
+    return Coalesce(
+        _comment_aggregate(Count('id'), IntegerField()), Value(0)
+    )
+
+
+def _last_comment_at():
+    return _comment_aggregate(Max('pub_date'), DateTimeField())
+
+
+def comment_added(review_id, commented_at, using='default'):
+    """Учитывает новый комментарий одним атомарным UPDATE отзыва."""
+    Review.objects.using(using).filter(pk=review_id).update(
+        comments_count=F('comments_count') + 1,
+        last_comment_at=Greatest(
+            'last_comment_at', Value(commented_at),
+            output_field=DateTimeField()
+        ),
+        modified=timezone.now()
+    )
+
+
+def comment_removed(review_id, using='default'):
+    """Учитывает удалённый комментарий.
+
+    Время последнего комментария берётся из оставшихся: индекс по
+    (review, pub_date) отдаёт максимум без обхода комментариев.
+
+    """
+    Review.objects.using(using).filter(pk=review_id).update(
+        comments_count=F('comments_count') - 1,
+        last_comment_at=_last_comment_at(),
+        modified=timezone.now()
+    )
+
+
+def rebuild_comment_counts(queryset=None):
+    """Пересчитывает число и время комментариев переданных отзывов."""
+    if queryset is None:
+        queryset = Review.objects.all()
+    return queryset.order_by().update(
+        comments_count=_comments_count(),
+        last_comment_at=_last_comment_at(),
+        modified=timezone.now()
+    )
+
+
+def stale_comment_counts(queryset=None):
+    """Отзывы, у которых сохранённые счётчики расходятся с комментариями."""
+    if queryset is None:
+        queryset = Review.objects.all()
+    return queryset.annotate(
+        actual_count=_comments_count(),
+        actual_last=_last_comment_at()
+    ).exclude(
+        Q(comments_count=F('actual_count'))
+        & (Q(last_comment_at=F('actual_last'))
+           | Q(last_comment_at__isnull=True, actual_last__isnull=True))
+    )
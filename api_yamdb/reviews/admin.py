@@ -1,12 +1,14 @@
 # api_yamdb/reviews/admin.py
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import Category, Comment, Genre, OutgoingEmail, Review, Title
+from .models import User
 
 
 admin.site.register(Category)
 admin.site.register(Comment)
 admin.site.register(Genre)
+admin.site.register(OutgoingEmail)
 admin.site.register(Review)
 admin.site.register(Title)
 admin.site.register(User)
@@ -0,0 +1,111 @@
+# api_yamdb/reviews/facets.py
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Count
+
+from reviews.models import FACET_CATEGORY, FACET_GENRE, FACET_YEAR
+from reviews.models import FacetCount, Title
+
+
+def shift_facet(facet, deltas, using='default'):
+    """Сдвигает счётчики значений фасета на величины из deltas.
+
+    Все значения меняются одним INSERT ... ON CONFLICT: новые
+    строки создаются, существующие увеличиваются в самой базе, так
+    что параллельные изменения не теряются и число запросов не
+    зависит от числа значений. Строки идут в одном порядке, чтобы
+    параллельные вставки не блокировали друг друга взаимно.
+
+    """
+    rows = sorted(
+        (facet, value, delta) for value, delta in deltas.items()
+        if value is not None and delta
+    )
+    if not rows:
+        return
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(FacetCount._meta.db_table)
+    count = quote('count')
+    placeholders = ', '.join(['(%s, %s, %s)'] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (facet, value, {count}) '
+            f'VALUES {placeholders} '
+            f'ON CONFLICT (facet, value) '
+            f'DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}',
+            [item for row in rows for item in row]
+        )
+
+
+def tally(values, sign=1):
+    return {value: number * sign for value, number in Counter(values).items()}
+
+
+def move_facet(facet, old, new):
+    """Переносит одно произведение от старого значения к новому."""
+    if old != new:
+        shift_facet(facet, {old: -1, new: 1})
+
+
+def count_titles(titles, sign=1, using='default'):
+    """Учитывает категории и годы добавленных или удалённых произведений."""
+    titles = list(titles)
+    shift_facet(
+        FACET_CATEGORY, tally((title.category_id for title in titles), sign),
+        using
+    )
+    shift_facet(
+        FACET_YEAR, tally((title.year for title in titles), sign), using
+    )
+
+
+def count_genres(genre_ids, sign=1, using='default'):
+    """Учитывает добавленные или удалённые связи с жанрами."""
+    shift_facet(FACET_GENRE, tally(genre_ids, sign), using)
+
+
+def actual_facets():
+    """Счётчики всех фасетов, посчитанные заново по произведениям."""
+    def grouped(queryset, field):
+        return dict(
+            queryset.order_by().values(field).annotate(count=Count('pk'))
+            .values_list(field, 'count')
+        )
+
+    return {
+        FACET_GENRE: grouped(Title.genre.through.objects.all(), 'genre_id'),
+        FACET_CATEGORY: grouped(
+            Title.objects.filter(category__isnull=False), 'category_id'
+        ),
+        FACET_YEAR: grouped(Title.objects.all(), 'year'),
+    }
+
+
+def stale_facets():
+    """Пары (фасет, значение), у которых счётчик расходится с данными."""
+    actual = actual_facets()
+    stored = {facet: {} for facet in actual}
+    for facet, value, count in FacetCount.objects.values_list(
+            'facet', 'value', 'count'):
+        stored.setdefault(facet, {})[value] = count
+    return sorted(
+        (facet, value)
+        for facet in stored
+        for value in set(actual.get(facet, {})) | set(stored[facet])
+        if actual.get(facet, {}).get(value, 0) != stored[facet].get(value, 0)
+    )
+
+
+def rebuild_facets():
+    """Пересчитывает все счётчики фасетов; возвращает число значений."""
+    rows = [
+        FacetCount(facet=facet, value=value, count=count)
+        for facet, counts in actual_facets().items()
+        for value, count in counts.items()
+    ]
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(rows)
+    return len(rows)
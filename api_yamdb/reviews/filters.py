@@ -3,26 +3,47 @@ import django_filters.rest_framework as filter
 from reviews.models import Title
 
 
+class CharInFilter(filter.BaseInFilter, filter.CharFilter):
+    """Фильтр по одному значению или списку значений через запятую."""
+
+    pass
+
+
 class TitlesFilters(filter.FilterSet):
-    """Фильтр для сортировки произведений по параметрам."""
+    """Фильтр для сортировки произведений по параметрам.
+
+    Название ищется по подстроке с опорой на триграммный индекс,
+    слаги категорий и жанров сравниваются точно, год — точно
+    или по диапазону.
+
+    """
 
     name = filter.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    category = filter.CharFilter(
+    category = CharInFilter(
         field_name='category__slug',
-        lookup_expr='icontains'
+        lookup_expr='in'
     )
-    genre = filter.CharFilter(
+    genre = CharInFilter(
         field_name='genre__slug',
-        lookup_expr='icontains'
+        lookup_expr='in',
+        distinct=True
     )
     year = filter.NumberFilter(
         field_name='year',
-        lookup_expr='icontains'
+        lookup_expr='exact'
+    )
+    year_min = filter.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = filter.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('name', 'category', 'genre', 'year')
         model = Title
@@ -0,0 +1,257 @@
+# api_yamdb/reviews/importer.py
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from reviews.activity import rebuild_comment_counts
+from reviews.facets import count_genres, count_titles
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.ratings import rebuild_ratings
+
+DATASETS = {
+    'users': User,
+    'categories': Category,
+    'genres': Genre,
+    'titles': Title,
+    'genre_title': Title.genre.through,
+    'reviews': Review,
+    'comments': Comment,
+}
+
+
+class DataImportError(Exception):
+    """Ошибка в исходных данных или их формате."""
+
+
+def read_records(path, file_format):
+    """Построчно читает CSV или NDJSON, не загружая файл целиком."""
+    with open(path, encoding='utf-8', newline='') as source:
+        if file_format == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise DataImportError(
+                    f'Строка {line_number}: некорректный JSON ({error})'
+                )
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_value(value):
+    """Значение в текстовом формате COPY."""
+    if value is None:
+        return '\\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class Checkpoint:
+    """Число загруженных строк, сохраняемое после каждой пачки."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)['rows']
+
+    def save(self, rows):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'rows': rows}, file)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Importer:
+    """Загружает записи одной модели пачками.
+
+    На Postgres пачка уходит одной командой COPY, на остальных базах —
+    через bulk_create. Каждая пачка фиксируется отдельной транзакцией,
+    после чего сохраняется контрольная точка, так что прерванную
+    загрузку можно продолжить с места остановки.
+
+    """
+
+    def __init__(self, model, batch_size=5000, use_copy=True,
+                 using='default'):
+        self.model = model
+        self.batch_size = batch_size
+        self.connection = connections[using]
+        self.using = using
+        self.use_copy = use_copy and self.connection.vendor == 'postgresql'
+        self.fields = None
+        self.has_pk = False
+
+    def resolve_fields(self, record):
+        opts = self.model._meta
+        names = set()
+        for key in record:
+            try:
+                names.add(opts.get_field(key).attname)
+            except FieldDoesNotExist:
+                raise DataImportError(
+                    f'У модели {opts.label} нет поля «{key}»'
+                )
+        self.has_pk = opts.pk.attname in names
+        self.fields = [
+            field for field in opts.concrete_fields
+            if not field.primary_key or self.has_pk
+        ]
+
+    def prepare(self, record):
+        """Приводит запись к значениям колонок с учётом умолчаний."""
+        values = {}
+        for key, value in record.items():
+            values[self.model._meta.get_field(key).attname] = value
+        row = []
+        for field in self.fields:
+            if field.attname not in values or (
+                    values[field.attname] in ('', None)
+                    and self.is_auto_date(field)):
+                value = self.default(field)
+            else:
+                value = values[field.attname]
+                if value == '' and field.null:
+                    value = None
+                try:
+                    value = field.to_python(value)
+                except ValidationError as error:
+                    raise DataImportError(
+                        f'Поле «{field.name}»: {" ".join(error.messages)}'
+                    )
+            row.append(value)
+        return row
+
+    @staticmethod
+    def is_auto_date(field):
+        return getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        )
+
+    def default(self, field):
+        if self.is_auto_date(field):
+            return timezone.now()
+        if self.model is User and field.attname == 'password':
+            return make_password(None)
+        return field.get_default()
+
+    def write(self, rows):
+        if self.use_copy:
+            self.copy(rows)
+        else:
+            self.model.objects.using(self.using).bulk_create(
+                self.model(**dict(zip(
+                    (field.attname for field in self.fields), row
+                )))
+                for row in rows
+            )
+        self.after_batch(rows)
+
+    def copy(self, rows):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in self.fields)
+        with self.connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+            # copy_expert вызывается у курсора psycopg2 напрямую, и его
+            # ошибки нужно перевести в DatabaseError Django самим.
+            with self.connection.wrap_database_errors:
+                cursor.cursor.copy_expert(
+                    f'COPY {quote(self.model._meta.db_table)} ({columns}) '
+                    f'FROM STDIN',
+                    buffer
+                )
+
+    def column(self, rows, attname):
+        position = [field.attname for field in self.fields].index(attname)
+        return [row[position] for row in rows]
+
+    def after_batch(self, rows):
+        """Обновляет денормализованные данные, которые обходит COPY."""
+        if self.model is Review:
+            rebuild_ratings(Title.objects.using(self.using).filter(
+                pk__in=set(self.column(rows, 'title_id'))
+            ))
+        elif self.model is Title:
+            titles = [
+                Title(category_id=category_id, year=year)
+                for category_id, year in zip(
+                    self.column(rows, 'category_id'),
+                    self.column(rows, 'year')
+                )
+            ]
+            count_titles(titles, using=self.using)
+        elif self.model is Title.genre.through:
+            count_genres(self.column(rows, 'genre_id'), using=self.using)
+        elif self.model is Comment:
+            rebuild_comment_counts(Review.objects.using(self.using).filter(
+                pk__in=set(self.column(rows, 'review_id'))
+            ))
+
+    def reset_sequences(self):
+        if not self.has_pk:
+            return
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def run(self, records, skip=0, on_batch=None):
+        """Загружает записи, пропуская уже загруженные skip строк."""
+        records = islice(records, skip, None)
+        loaded = skip
+        started = time.monotonic()
+        for batch in batched(records, self.batch_size):
+            if self.fields is None:
+                self.resolve_fields(batch[0])
+            rows = [self.prepare(record) for record in batch]
+            try:
+                with transaction.atomic(using=self.using):
+                    self.write(rows)
+            except DatabaseError as error:
+                raise DataImportError(
+                    f'Пачка со строки {loaded + 1} не загружена: {error}'
+                )
+            loaded += len(rows)
+            if on_batch is not None:
+                on_batch(loaded, loaded - skip, time.monotonic() - started)
+        self.reset_sequences()
+        return loaded
@@ -0,0 +1,86 @@
+# api_yamdb/reviews/management/commands/export_data.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from reviews.exporter import EXPORTS, FORMATS, Exporter
+
+
+def moment(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает произведения с рейтингами, отзывы или комментарии '
+        'в NDJSON или CSV потоком, не загружая их в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--output',
+            help='Файл выгрузки; по умолчанию стандартный вывод.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат; по умолчанию по расширению файла, иначе NDJSON.'
+        )
+        parser.add_argument(
+            '--after-id',
+            type=int,
+            help='Выгрузить только записи с id больше указанного.'
+        )
+        parser.add_argument(
+            '--since',
+            type=moment,
+            help='Выгрузить только записи, изменённые с этого момента.'
+        )
+        parser.add_argument(
+            '--append',
+            action='store_true',
+            help='Дописать в конец файла, например при продолжении.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из курсора за раз.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['output']
+        file_format = options['format'] or (
+            'csv' if path and path.lower().endswith('.csv') else 'ndjson'
+        )
+        exporter = Exporter(
+            options['dataset'], chunk_size=options['chunk_size']
+        )
+        try:
+            target = (
+                open(path, 'a' if options['append'] else 'w',
+                     encoding='utf-8', newline='')
+                if path else sys.stdout
+            )
+        except OSError as error:
+            raise CommandError(error)
+        try:
+            target.writelines(exporter.export(
+                file_format,
+                after_id=options['after_id'],
+                since=options['since'],
+                header=not options['append']
+            ))
+        finally:
+            if path:
+                target.close()
+        report = self.stdout if path else self.stderr
+        report.write(self.style.SUCCESS(
+            f'Выгружено строк: {exporter.exported}, '
+            f'последний id: {exporter.last_id}.'
+        ))
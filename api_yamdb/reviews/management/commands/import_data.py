@@ -0,0 +1,82 @@
+# api_yamdb/reviews/management/commands/import_data.py
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import response_cache
+from reviews.importer import Checkpoint, DATASETS, DataImportError
+from reviews.importer import Importer, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, категории, жанры, произведения, '
+        'связи произведений с жанрами, отзывы и комментарии '
+        'из CSV или NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('path', help='Путь к файлу с данными.')
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'ndjson'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько строк загружать в одной транзакции.'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Использовать bulk_create вместо COPY на Postgres.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки; по умолчанию <path>.progress.'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать загрузку заново, не учитывая контрольную точку.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson'
+        )
+        checkpoint = Checkpoint(
+            options['checkpoint'] or f'{path}.progress'
+        )
+        if options['restart']:
+            checkpoint.clear()
+        skip = checkpoint.load()
+        if skip:
+            self.stdout.write(f'Продолжаем с строки {skip + 1}.')
+
+        importer = Importer(
+            DATASETS[options['dataset']],
+            batch_size=options['batch_size'],
+            use_copy=not options['no_copy']
+        )
+
+        def on_batch(loaded, imported, elapsed):
+            checkpoint.save(loaded)
+            rate = imported / elapsed if elapsed else 0
+            self.stdout.write(
+                f'Загружено строк: {loaded} ({rate:.0f} строк/с)'
+            )
+
+        try:
+            loaded = importer.run(
+                read_records(path, file_format), skip, on_batch
+            )
+        except (DataImportError, OSError) as error:
+            raise CommandError(error)
+        checkpoint.clear()
+        response_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {loaded} строк из {path}.'
+        ))
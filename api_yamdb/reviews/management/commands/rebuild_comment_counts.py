@@ -0,0 +1,59 @@
+# api_yamdb/reviews/management/commands/rebuild_comment_counts.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.activity import rebuild_comment_counts, stale_comment_counts
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает и проверяет число комментариев и время '
+        'последнего комментария у отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не изменяя.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Сколько отзывов обновлять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = list(
+                stale_comment_counts().values_list('pk', flat=True)[:20]
+            )
+            if stale:
+                raise CommandError(
+                    f'Счётчики расходятся с комментариями, например у '
+                    f'отзывов: {", ".join(map(str, stale))}'
+                )
+            self.stdout.write(self.style.SUCCESS('Счётчики в порядке.'))
+            return
+
+        batch_size = options['batch_size']
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Review.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += rebuild_comment_counts(
+                    Review.objects.filter(pk__gte=pks[0], pk__lte=pks[-1])
+                )
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано отзывов: {updated}.')
+        )
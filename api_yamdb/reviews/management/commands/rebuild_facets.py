@@ -0,0 +1,30 @@
+# api_yamdb/reviews/management/commands/rebuild_facets.py
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.facets import rebuild_facets, stale_facets
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и проверяет счётчики фасетов произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = stale_facets()[:20]
+            if stale:
+                raise CommandError(
+                    'Счётчики фасетов расходятся с данными, например: '
+                    + ', '.join(f'{facet}={value}' for facet, value in stale)
+                )
+            self.stdout.write(self.style.SUCCESS('Счётчики в порядке.'))
+            return
+        rebuilt = rebuild_facets()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано значений фасетов: {rebuilt}.')
+        )
@@ -0,0 +1,54 @@
+# api_yamdb/reviews/management/commands/rebuild_ratings.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.ratings import rebuild_ratings, stale_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и проверяет рейтинги произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не изменяя.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Сколько произведений обновлять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = list(stale_ratings().values_list('pk', flat=True)[:20])
+            if stale:
+                raise CommandError(
+                    f'Рейтинги расходятся с отзывами, например у '
+                    f'произведений: {", ".join(map(str, stale))}'
+                )
+            self.stdout.write(self.style.SUCCESS('Рейтинги в порядке.'))
+            return
+
+        batch_size = options['batch_size']
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Title.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += rebuild_ratings(
+                    Title.objects.filter(pk__gte=pks[0], pk__lte=pks[-1])
+                )
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}.')
+        )
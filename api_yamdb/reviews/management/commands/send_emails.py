@@ -0,0 +1,63 @@
+# api_yamdb/reviews/management/commands/send_emails.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import claim_batch, deliver_batch, outbox_stats
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько писем забирать из очереди за раз.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков отправки.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='После стольких неудачных попыток письмо не отправляется.'
+        )
+        parser.add_argument(
+            '--backoff', type=float, default=30,
+            help='Базовая задержка повторной попытки, в секундах.'
+        )
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='Через сколько секунд забранное письмо вернётся в очередь, '
+                 'если воркер не записал результат.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2,
+            help='Пауза между опросами пустой очереди, в секундах.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            emails = claim_batch(options['batch_size'], options['lease'])
+            if emails:
+                sent = deliver_batch(
+                    emails,
+                    options['workers'],
+                    options['max_attempts'],
+                    options['backoff']
+                )
+                stats = outbox_stats()
+                self.stdout.write(
+                    f'Отправлено {sent} из {len(emails)}; '
+                    f'в очереди {stats["pending"]}, '
+                    f'не доставлено {stats["dead"]}, '
+                    f'средняя задержка {stats["latency_avg_seconds"]:.1f} с'
+                )
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:04
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, IntegerField, OuterRef
+from django.db.models import Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def fill_ratings(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+
+    def aggregate(function):
+        return Coalesce(
+            Subquery(
+                Review.objects.filter(title=OuterRef('pk'))
+                .order_by()
+                .values('title')
+                .annotate(value=function)
+                .values('value'),
+                output_field=IntegerField()
+            ),
+            Value(0)
+        )
+
+    score_sum = aggregate(Sum('score'))
+    reviews_count = aggregate(Count('id'))
+    Title.objects.update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        rating=Cast(score_sum, FloatField()) / NullIf(reviews_count, Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:06
+
+from django.db import migrations, models
+import reviews.validator
+
+NAME_TRGM_INDEX = 'reviews_title_name_upper_trgm'
+
+
+def create_name_trgm_index(apps, schema_editor):
+    # Выражение совпадает с тем, что Django строит для icontains.
+    # Без расширения pg_trgm поиск работает, но без индекса.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {NAME_TRGM_INDEX} ON reviews_title '
+        f'USING gin ((UPPER("name"::text)) gin_trgm_ops)'
+    )
+
+
+def drop_name_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {NAME_TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.PositiveSmallIntegerField(db_index=True, validators=[reviews.validator.validate_year]),
+        ),
+        migrations.RunPython(create_name_trgm_index, drop_name_trgm_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_facet_counts(apps, schema_editor):
+    FacetCount = apps.get_model('reviews', 'FacetCount')
+    Title = apps.get_model('reviews', 'Title')
+
+    def grouped(queryset, field):
+        return (
+            queryset.order_by().values(field).annotate(count=Count('pk'))
+            .values_list(field, 'count')
+        )
+
+    sources = (
+        ('genre', grouped(Title.genre.through.objects.all(), 'genre_id')),
+        ('category', grouped(
+            Title.objects.filter(category__isnull=False), 'category_id'
+        )),
+        ('year', grouped(Title.objects.all(), 'year')),
+    )
+    FacetCount.objects.bulk_create(
+        FacetCount(facet=facet, value=value, count=count)
+        for facet, rows in sources
+        for value, count in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Год')], max_length=16)),
+                ('value', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='unique_facet_value'),
+        ),
+        migrations.RunPython(fill_facet_counts, migrations.RunPython.noop),
+    ]
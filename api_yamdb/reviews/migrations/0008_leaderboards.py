@@ -0,0 +1,62 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:57
+
+import math
+import time
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, FloatField, Func, OuterRef, Subquery, Sum
+from django.db.models import Value
+from django.db.models.functions import Exp, Greatest, Ln
+
+
+def fill_trending(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    decay = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+    now = time.time() * decay
+    epoch = Func(
+        F('pub_date'), template='EXTRACT(EPOCH FROM %(expressions)s)',
+        output_field=FloatField()
+    )
+    offset = Greatest(epoch * Value(decay) - Value(now), Value(-700.0))
+    Title.objects.update(trending_score=Subquery(
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=Value(now) + Ln(Sum(Exp(offset))))
+        .values('value'),
+        output_field=FloatField()
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_facet_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_trending, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(rating__isnull=False), fields=['-rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(rating__isnull=False), fields=['category', '-rating', 'id'], name='title_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(trending_score__isnull=False), fields=['-trending_score', 'id'], name='title_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(trending_score__isnull=False), fields=['category', '-trending_score', 'id'], name='title_category_trending_idx'),
+        ),
+    ]
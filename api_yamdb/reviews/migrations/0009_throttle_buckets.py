@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 22:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('tokens', models.FloatField()),
+                ('updated', models.FloatField()),
+                ('full_at', models.FloatField(db_index=True)),
+                ('allowed', models.BooleanField(default=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 22:10
+
+from django.db import migrations, models
+from django.db.models import Count, DateTimeField, IntegerField, Max
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_activity(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+
+    def aggregate(value, output_field):
+        return Subquery(
+            Comment.objects.filter(review=OuterRef('pk'))
+            .order_by()
+            .values('review')
+            .annotate(value=value)
+            .values('value'),
+            output_field=output_field
+        )
+
+    Review.objects.update(
+        comments_count=Coalesce(
+            aggregate(Count('id'), IntegerField()), Value(0)
+        ),
+        last_comment_at=aggregate(Max('pub_date'), DateTimeField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_throttle_buckets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            fill_comment_activity, migrations.RunPython.noop
+        ),
+    ]
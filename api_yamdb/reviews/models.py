@@ -1,6 +1,7 @@
 # api_yamdb/reviews/models.py
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from reviews.validator import validate_year
 
@@ -56,7 +57,10 @@ class Genre(models.Model):
 
 class Title(models.Model):
     name = models.CharField(max_length=50)
-    year = models.PositiveSmallIntegerField(validators=(validate_year,))
+    year = models.PositiveSmallIntegerField(
+        validators=(validate_year,),
+        db_index=True
+    )
     description = models.TextField(blank=True)
     genre = models.ManyToManyField(
         Genre,
@@ -70,13 +74,84 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         related_name='titles'
     )
+    score_sum = models.PositiveIntegerField(default=0, editable=False)
+    reviews_count = models.PositiveIntegerField(default=0, editable=False)
+    rating = models.FloatField(blank=True, null=True, editable=False)
+    trending_score = models.FloatField(blank=True, null=True, editable=False)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    _loaded_category_id = None
+    _loaded_year = None
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(fields=['-rating', 'id'], name='title_rating_idx',
+                         condition=models.Q(rating__isnull=False)),
+            models.Index(fields=['category', '-rating', 'id'],
+                         name='title_category_rating_idx',
+                         condition=models.Q(rating__isnull=False)),
+            models.Index(fields=['-trending_score', 'id'],
+                         name='title_trending_idx',
+                         condition=models.Q(trending_score__isnull=False)),
+            models.Index(fields=['category', '-trending_score', 'id'],
+                         name='title_category_trending_idx',
+                         condition=models.Q(trending_score__isnull=False)),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_facets()
+        return instance
+
+    def remember_loaded_facets(self):
+        """Запоминает сохранённые в базе категорию и год.
+
+        По ним обработчик post_save переносит произведение между
+        счётчиками фасетов, не пересчитывая их заново.
+
+        """
+        self._loaded_category_id = self.__dict__.get('category_id')
+        self._loaded_year = self.__dict__.get('year')
+
+
+FACET_GENRE = 'genre'
+FACET_CATEGORY = 'category'
+FACET_YEAR = 'year'
+FACET_CHOICES = (
+    (FACET_GENRE, 'Жанр'),
+    (FACET_CATEGORY, 'Категория'),
+    (FACET_YEAR, 'Год')
+)
+
+
+class FacetCount(models.Model):
+    """Число произведений с данным жанром, категорией или годом.
+
+    Значение — id жанра или категории либо сам год. Счётчики
+    поддерживаются сигналами и отдают фасеты без фильтров, не
+    обходя все произведения.
+
+    """
+
+    facet = models.CharField(max_length=16, choices=FACET_CHOICES)
+    value = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'],
+                                    name='unique_facet_value')
+        ]
+
+    def __str__(self):
+        return f'{self.facet}={self.value}: {self.count}'
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -92,16 +167,48 @@ class Review(models.Model):
     )
     score = models.PositiveSmallIntegerField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(
+        blank=True, null=True, editable=False
+    )
+
+    _loaded_score = None
+    _loaded_title_id = None
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['title', 'author'],
                                     name='unique_review')
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx')
+        ]
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_score()
+        return instance
+
+    def remember_loaded_score(self):
+        """Запоминает оценку и произведение, сохранённые в базе.
+
+        Нужны обработчику post_save, чтобы пересчитать рейтинг
+        произведения на разницу, а не по всем отзывам.
+
+        """
+        self._loaded_score = self.__dict__.get('score')
+        self._loaded_title_id = self.__dict__.get('title_id')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -116,6 +223,92 @@ class Comment(models.Model):
         related_name='comments'
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    _loaded_review_id = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx')
+        ]
 
     def __str__(self):
         return self.text
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_review()
+        return instance
+
+    def remember_loaded_review(self):
+        """Запоминает отзыв, к которому комментарий сохранён в базе."""
+        self._loaded_review_id = self.__dict__.get('review_id')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+EMAIL_PENDING = 'pending'
+EMAIL_SENT = 'sent'
+EMAIL_DEAD = 'dead'
+EMAIL_STATUS_CHOICES = (
+    (EMAIL_PENDING, 'Ожидает отправки'),
+    (EMAIL_SENT, 'Отправлено'),
+    (EMAIL_DEAD, 'Не доставлено')
+)
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Создаётся в той же транзакции, что и изменение данных, и
+    отправляется отдельным процессом командой send_emails.
+
+    """
+
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.EmailField()
+    status = models.CharField(
+        max_length=16,
+        choices=EMAIL_STATUS_CHOICES,
+        default=EMAIL_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at'],
+                         name='outbox_pending_due_idx',
+                         condition=models.Q(status=EMAIL_PENDING))
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipient}'
+
+
+class ThrottleBucket(models.Model):
+    """Корзина токенов ограничителя частоты запросов.
+
+    Нужна общему для воркеров бэкенду api.throttling.DatabaseBuckets.
+    Время хранится в секундах по часам базы, full_at — момент, когда
+    корзина снова наполнится и строку можно удалить.
+
+    """
+
+    key = models.CharField(max_length=200, unique=True)
+    tokens = models.FloatField()
+    updated = models.FloatField()
+    full_at = models.FloatField(db_index=True)
+    allowed = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f'{self.key}: {self.tokens:.2f}'
@@ -0,0 +1,126 @@
+# api_yamdb/reviews/outbox.py
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.mail import get_connection, send_mail
+from django.db import connection, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from reviews.models import EMAIL_DEAD, EMAIL_PENDING, EMAIL_SENT
+from reviews.models import OutgoingEmail
+
+
+def queue_email(subject, body, from_email, recipient):
+    """Ставит письмо в очередь; вызывать внутри транзакции изменения."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient
+    )
+
+
+def claim_batch(batch_size, lease):
+    """Забирает пачку писем, готовых к отправке.
+
+    Строки блокируются с SKIP LOCKED, поэтому несколько воркеров
+    не получат одно письмо. Срок следующей попытки сдвигается на
+    lease секунд: если воркер упадёт, письмо вернётся в очередь.
+
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=EMAIL_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + timedelta(seconds=lease))
+    return emails
+
+
+def backoff_delay(attempts, base, cap=3600):
+    """Экспоненциальная задержка со случайным разбросом."""
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def deliver(email, max_attempts, backoff):
+    """Отправляет одно письмо и записывает результат."""
+    try:
+        send_mail(
+            email.subject,
+            email.body,
+            email.from_email,
+            [email.recipient],
+            connection=get_connection()
+        )
+    except Exception as error:
+        attempts = email.attempts + 1
+        changes = {'attempts': attempts, 'last_error': repr(error)}
+        if attempts >= max_attempts:
+            changes['status'] = EMAIL_DEAD
+        else:
+            changes['next_attempt_at'] = timezone.now() + timedelta(
+                seconds=backoff_delay(attempts, backoff)
+            )
+        OutgoingEmail.objects.filter(pk=email.pk).update(**changes)
+        return False
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        status=EMAIL_SENT,
+        attempts=F('attempts') + 1,
+        sent_at=timezone.now(),
+        last_error=''
+    )
+    return True
+
+
+def deliver_batch(emails, workers, max_attempts, backoff):
+    """Отправляет пачку пулом потоков; возвращает число успешных."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_deliver_in_thread, email, max_attempts, backoff)
+            for email in emails
+        ]
+        return sum(future.result() for future in futures)
+
+
+def _deliver_in_thread(email, max_attempts, backoff):
+    try:
+        return deliver(email, max_attempts, backoff)
+    finally:
+        connection.close()
+
+
+def outbox_stats(window=timedelta(hours=1)):
+    """Глубина очереди и задержка доставки за последний период."""
+    now = timezone.now()
+    pending = OutgoingEmail.objects.filter(status=EMAIL_PENDING).aggregate(
+        count=Count('id'), oldest=Min('created_at')
+    )
+    latency = ExpressionWrapper(
+        F('sent_at') - F('created_at'), output_field=DurationField()
+    )
+    sent = OutgoingEmail.objects.filter(
+        status=EMAIL_SENT, sent_at__gte=now - window
+    ).annotate(latency=latency).aggregate(
+        average=Avg('latency'), maximum=Max('latency')
+    )
+
+    def seconds(value):
+        return value.total_seconds() if value is not None else 0.0
+
+    return {
+        'pending': pending['count'],
+        'dead': OutgoingEmail.objects.filter(status=EMAIL_DEAD).count(),
+        'oldest_pending_seconds': seconds(
+            now - pending['oldest'] if pending['oldest'] else None
+        ),
+        'latency_avg_seconds': seconds(sent['average']),
+        'latency_max_seconds': seconds(sent['maximum']),
+    }
@@ -0,0 +1,107 @@
+# api_yamdb/reviews/purge.py
+from collections import defaultdict
+
+from django.db import connections, transaction
+
+from reviews.activity import rebuild_comment_counts
+from reviews.models import Comment, Review
+from reviews.ratings import shift_ratings
+
+CHUNK_SIZE = 1000
+
+
+def delete_rows(model, column, values, using='default'):
+    """DELETE по списку значений столбца без загрузки объектов и сигналов."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(column)} = ANY(%s)',
+            [list(values)]
+        )
+        return cursor.rowcount
+
+
+def chunks(queryset, fields, chunk_size):
+    """Пачки значений полей по возрастанию pk, первое поле — pk.
+
+    Каждая пачка читается отдельным запросом после удаления
+    предыдущей, так что в памяти не больше chunk_size строк.
+
+    """
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list(*fields)[:chunk_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def purge_comments(comments, chunk_size=CHUNK_SIZE, using='default'):
+    """Удаляет комментарии пачками и пересчитывает счётчики их отзывов."""
+    deleted = 0
+    for rows in chunks(comments.using(using), ('pk', 'review_id'),
+                       chunk_size):
+        with transaction.atomic(using=using):
+            deleted += delete_rows(
+                Comment, 'id', [pk for pk, review_id in rows], using
+            )
+            rebuild_comment_counts(Review.objects.using(using).filter(
+                pk__in={review_id for pk, review_id in rows}
+            ))
+    return deleted
+
+
+def purge_reviews(reviews, chunk_size=CHUNK_SIZE, using='default'):
+    """Удаляет отзывы вместе с комментариями пачками.
+
+    Каждая пачка — отдельная короткая транзакция: комментарии и
+    отзывы удаляются двумя DELETE, рейтинги их произведений
+    сдвигаются одним UPDATE. Прерванное удаление оставляет данные
+    согласованными, его можно просто повторить.
+
+    """
+    deleted = 0
+    for rows in chunks(reviews.using(using), ('pk', 'title_id', 'score'),
+                       chunk_size):
+        deltas = defaultdict(lambda: (0, 0))
+        for pk, title_id, score in rows:
+            score_delta, count_delta = deltas[title_id]
+            deltas[title_id] = (score_delta - score, count_delta - 1)
+        ids = [row[0] for row in rows]
+        with transaction.atomic(using=using):
+            delete_rows(Comment, 'review_id', ids, using)
+            deleted += delete_rows(Review, 'id', ids, using)
+            shift_ratings(deltas, using)
+    return deleted
+
+
+def purge_title(title, chunk_size=CHUNK_SIZE):
+    """Удаляет произведение, заранее убрав отзывы пачками.
+
+    Collector при обычном удалении загрузил бы все отзывы и
+    комментарии в память и удалил их в одной транзакции. Само
+    произведение удаляется как обычно, и сигналы обновляют фасеты.
+
+    """
+    purge_reviews(Review.objects.filter(title=title), chunk_size)
+    title.delete()
+
+
+def purge_review(review, chunk_size=CHUNK_SIZE):
+    """Удаляет отзыв, заранее убрав комментарии пачками."""
+    for rows in chunks(review.comments.all(), ('pk',), chunk_size):
+        delete_rows(Comment, 'id', [pk for pk, in rows])
+    review.delete()
+
+
+def purge_user(user, chunk_size=CHUNK_SIZE):
+    """Удаляет пользователя, заранее убрав его отзывы и комментарии."""
+    purge_comments(Comment.objects.filter(author=user), chunk_size)
+    purge_reviews(Review.objects.filter(author=user), chunk_size)
+    user.delete()
@@ -0,0 +1,206 @@
+# api_yamdb/reviews/ratings.py
+import math
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, Func, IntegerField
+from django.db.models import OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Abs, Cast, Coalesce, Exp, Greatest
+from django.db.models.functions import Least, Ln, NullIf
+from django.utils import timezone
+
+from reviews.models import Review, Title
+
+# exp(-700) ещё представимо во float; меньшие вклады отбрасываются.
+MAX_EXPONENT = 700.0
+LEADERBOARDS = {
+    'top': 'rating',
+    'trending': 'trending_score',
+}
+
+
+class EpochSeconds(Func):
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+
+def rating_expression(score_sum, reviews_count):
+    """Средняя оценка; NULL, если отзывов нет."""
+    return (
+        Cast(score_sum, FloatField())
+        / NullIf(reviews_count, Value(0))
+    )
+
+
+def decay_rate():
+    """Скорость затухания популярности в секунду по периоду полураспада."""
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def trending_point(moment):
+    """Вклад отзыва в логарифмической шкале: λ·t.
+
+    Наивное время считается местным, как его хранит база при
+    USE_TZ = False.
+
+    """
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(
+            moment, timezone.get_default_timezone(), is_dst=False
+        )
+    return moment.timestamp() * decay_rate()
+
+
+def log_add_exp(field, point):
+    """ln(e^field + e^point) без переполнения; NULL — пустая сумма."""
+    current = F(field)
+    point = Value(point)
+    return Case(
+        When(**{f'{field}__isnull': True}, then=point),
+        default=Greatest(current, point) + Ln(
+            Value(1.0) + Exp(-Least(Abs(current - point),
+                                    Value(MAX_EXPONENT)))
+        ),
+        output_field=FloatField()
+    )
+
+
+def update_rating(title_id, score_delta, count_delta, reviewed_at=None):
+    """Сдвигает сумму оценок и число отзывов одним UPDATE.
+
+    Запрос атомарен: новые значения считаются из текущих
+    в самой базе, поэтому параллельные отзывы не теряются.
+    reviewed_at добавляет новый отзыв в популярность произведения.
+
+    """
+    if not score_delta and not count_delta:
+        return
+    score_sum = F('score_sum') + score_delta
+    reviews_count = F('reviews_count') + count_delta
+    changes = {
+        'score_sum': score_sum,
+        'reviews_count': reviews_count,
+        'rating': rating_expression(score_sum, reviews_count),
+        'modified': timezone.now(),
+    }
+    if reviewed_at is not None:
+        changes['trending_score'] = log_add_exp(
+            'trending_score', trending_point(reviewed_at)
+        )
+    Title.objects.filter(pk=title_id).update(**changes)
+
+
+def shift_ratings(deltas, using='default'):
+    """Сдвигает суммы оценок и число отзывов многих произведений сразу.
+
+    deltas — {id произведения: (сдвиг суммы, сдвиг числа отзывов)}.
+    Все произведения меняются одним UPDATE ... FROM (VALUES ...), как
+    в update_rating, без популярности: удалённые отзывы остаются в
+    ней до rebuild_ratings.
+
+    """
+    rows = sorted(
+        (title_id, score, count)
+        for title_id, (score, count) in deltas.items()
+        if score or count
+    )
+    if not rows:
+        return
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(Title._meta.db_table)
+    count = quote('count')
+    score_sum = f'{table}.score_sum + delta.score'
+    reviews_count = f'{table}.reviews_count + delta.{count}'
+    placeholders = ', '.join(['(%s, %s, %s)'] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET score_sum = {score_sum}, '
+            f'reviews_count = {reviews_count}, '
+            f'rating = ({score_sum})::float / NULLIF({reviews_count}, 0), '
+            f'modified = %s '
+            f'FROM (VALUES {placeholders}) AS delta (id, score, {count}) '
+            f'WHERE {table}.id = delta.id',
+            [timezone.now()] + [item for row in rows for item in row]
+        )
+
+
+def _review_aggregate(aggregate):
+    return Coalesce(
+        Subquery(
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+            .annotate(value=aggregate)
+            .values('value'),
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def _trending_aggregate():
+    """Популярность по всем отзывам: ln Σ e^(λ·t).
+
+    Экспоненты считаются относительно текущего момента, чтобы не
+    переполняться.
+
+    """
+    now = time.time() * decay_rate()
+    offset = EpochSeconds(F('pub_date')) * Value(decay_rate()) - Value(now)
+    return Subquery(
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=Value(now) + Ln(Sum(Exp(
+            Greatest(offset, Value(-MAX_EXPONENT))
+        ))))
+        .values('value'),
+        output_field=FloatField()
+    )
+
+
+def rebuild_ratings(queryset=None):
+    """Пересчитывает агрегаты по отзывам для переданных произведений."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    score_sum = _review_aggregate(Sum('score'))
+    reviews_count = _review_aggregate(Count('id'))
+    return queryset.order_by().update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        rating=rating_expression(score_sum, reviews_count),
+        trending_score=_trending_aggregate(),
+        modified=timezone.now()
+    )
+
+
+def leaderboard(board, genre=None, category=None):
+    """Произведения по убыванию рейтинга или популярности.
+
+    Порядок поддержан частичными индексами по полю, в том числе
+    внутри категории, поэтому первые места читаются без сортировки
+    всего каталога.
+
+    """
+    field = LEADERBOARDS[board]
+    queryset = Title.objects.filter(**{f'{field}__isnull': False})
+    if category:
+        queryset = queryset.filter(category__slug=category)
+    if genre:
+        queryset = queryset.filter(genre__slug=genre)
+    return queryset.order_by(f'-{field}', 'id')
+
+
+def stale_ratings(queryset=None):
+    """Произведения, у которых сохранённые агрегаты расходятся с отзывами."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    return queryset.annotate(
+        actual_sum=_review_aggregate(Sum('score')),
+        actual_count=_review_aggregate(Count('id'))
+    ).exclude(
+        score_sum=F('actual_sum'),
+        reviews_count=F('actual_count')
+    )
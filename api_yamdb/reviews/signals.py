@@ -0,0 +1,173 @@
+# api_yamdb/reviews/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.activity import comment_added, comment_removed
+from reviews.activity import rebuild_comment_counts
+from reviews.facets import count_genres, count_titles, move_facet
+from reviews.facets import rebuild_facets
+from reviews.models import FACET_CATEGORY, FACET_GENRE, FACET_YEAR
+from reviews.models import Category, Comment, FacetCount, Genre, Review
+from reviews.models import Title
+from reviews.ratings import rebuild_ratings, update_rating
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Обновляет рейтинг произведения после создания или правки отзыва."""
+    if raw:
+        return
+    if created:
+        update_rating(
+            instance.title_id, instance.score, 1,
+            reviewed_at=instance.pub_date
+        )
+    elif instance._loaded_title_id is None:
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+    elif instance._loaded_title_id != instance.title_id:
+        update_rating(instance._loaded_title_id, -instance._loaded_score, -1)
+        update_rating(instance.title_id, instance.score, 1)
+    else:
+        update_rating(
+            instance.title_id, instance.score - instance._loaded_score, 0
+        )
+    instance.remember_loaded_score()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Обновляет рейтинг произведения после удаления отзыва.
+
+    Срабатывает и при каскадном удалении вместе с пользователем.
+
+    """
+    update_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Обновляет число и время комментариев отзыва."""
+    if raw:
+        return
+    if created:
+        comment_added(instance.review_id, instance.pub_date)
+    elif instance._loaded_review_id != instance.review_id:
+        rebuild_comment_counts(Review.objects.filter(
+            pk__in={instance._loaded_review_id, instance.review_id}
+        ))
+    instance.remember_loaded_review()
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Срабатывает и при каскадном удалении вместе с пользователем."""
+    comment_removed(instance.review_id)
+
+
+def touch_titles(queryset):
+    """Сдвигает время изменения произведений, чтобы сменился их ETag."""
+    queryset.order_by().update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, created=False, raw=False, **kwargs):
+    """Категория выводится в произведении, поэтому меняет и его.
+
+    При удалении ссылка обнуляется через UPDATE без сохранения
+    произведений, так что время изменения сдвигается заранее.
+
+    """
+    if not created and not raw:
+        touch_titles(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def genre_changed(sender, instance, created=False, raw=False, **kwargs):
+    """То же для жанров: связи удаляются без сигнала m2m_changed."""
+    if not created and not raw:
+        touch_titles(Title.objects.filter(genre=instance))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Изменение списка жанров не сохраняет само произведение."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch_titles(Title.objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        touch_titles(Title.objects.filter(genre=instance))
+    else:
+        touch_titles(Title.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    """Переносит произведение между счётчиками категорий и годов."""
+    if raw:
+        return
+    if created:
+        count_titles([instance])
+    elif instance._loaded_year is None:
+        rebuild_facets()
+    else:
+        move_facet(
+            FACET_CATEGORY, instance._loaded_category_id,
+            instance.category_id
+        )
+        move_facet(FACET_YEAR, instance._loaded_year, instance.year)
+    instance.remember_loaded_facets()
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    """Связи с жанрами удаляются каскадом без m2m_changed."""
+    count_genres(
+        Title.genre.through.objects.filter(title_id=instance.pk)
+        .values_list('genre_id', flat=True),
+        -1
+    )
+    count_titles([instance], -1)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    FacetCount.objects.filter(
+        facet=FACET_CATEGORY, value=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=Genre)
+def genre_deleted(sender, instance, **kwargs):
+    FacetCount.objects.filter(facet=FACET_GENRE, value=instance.pk).delete()
+
+
+def genre_links(instance, reverse, pk_set=None):
+    """Жанры затронутых связей произведений и жанров."""
+    links = Title.genre.through.objects.all()
+    if reverse:
+        links = links.filter(genre_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(title_id__in=pk_set)
+    else:
+        links = links.filter(title_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(genre_id__in=pk_set)
+    return links.values_list('genre_id', flat=True)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_counted(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Сдвигает счётчики жанров на реально добавленные и удалённые связи."""
+    if action == 'post_add':
+        count_genres(genre_links(instance, reverse, pk_set))
+    elif action == 'pre_remove':
+        count_genres(genre_links(instance, reverse, pk_set), -1)
+    elif action == 'pre_clear':
+        count_genres(genre_links(instance, reverse), -1)
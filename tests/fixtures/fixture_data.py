@@ -0,0 +1,69 @@
+import pytest
+
+
+@pytest.fixture
+def clear_caches():
+    from api.cache import replica_pins, response_cache, user_cache
+    caches = (
+        response_cache.backend, response_cache.versions, user_cache,
+        replica_pins,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    """Корзины ограничителей частоты общие для процесса: тесты не делят их."""
+    from api.throttling import throttle_buckets
+
+    throttle_buckets.clear()
+    yield
+    throttle_buckets.clear()
+
+
+@pytest.fixture
+def catalogue(django_user_model):
+    """Каталог с несколькими страницами произведений, отзывов и комментариев."""
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    titles = []
+    for number in range(6):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(6)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=5
+        )
+        for author in authors
+    ]
+    comments = [
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий'
+        )
+        for author in authors
+    ]
+    return {
+        'category': category,
+        'genres': genres,
+        'titles': titles,
+        'reviews': reviews,
+        'comments': comments,
+    }
@@ -0,0 +1,52 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def get_client(user):
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', role='user'
+    )
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestModerator', email='moderator@yamdb.fake',
+        role='moderator'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    return get_client(user)
+
+
+@pytest.fixture
+def moderator_client(moderator):
+    return get_client(moderator)
+
+
+@pytest.fixture
+def admin_client(admin):
+    return get_client(admin)
+
+
+@pytest.fixture
+def anonymous_client():
+    return APIClient()
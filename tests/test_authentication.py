@@ -0,0 +1,98 @@
+import os
+import runpy
+from types import SimpleNamespace
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from tests.fixtures.fixture_user import get_client
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+class TestCachedUser:
+    """Кэш пользователей не переживает изменения учётной записи."""
+
+    def test_role_change_applies_immediately(self, user, admin_client):
+        client = get_client(user)
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 403, (
+            'Обычному пользователю список пользователей недоступен'
+        )
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'role': 'admin'},
+            format='json'
+        )
+        assert response.status_code == 200
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Новая роль должна действовать без ожидания истечения кэша'
+        )
+
+    def test_deleted_user_is_rejected(self, user, admin_client):
+        client = get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Токен удалённого пользователя не должен проходить проверку'
+        )
+
+    def test_role_change_in_other_worker(self, admin, admin_client,
+                                         monkeypatch, settings):
+        from api import authentication
+        from api.cache import load_backend
+
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        this_worker = authentication.user_cache
+        # Роль меняет другой воркер: он вытесняет пользователя
+        # через собственный экземпляр кэша.
+        monkeypatch.setattr(
+            authentication, 'user_cache', load_backend(settings.API_USER_CACHE)
+        )
+        admin.role = 'user'
+        admin.save()
+        monkeypatch.setattr(authentication, 'user_cache', this_worker)
+        assert admin_client.get('/api/v1/users/').status_code == 403, (
+            'Смена роли в одном воркере должна действовать во всех'
+        )
+
+
+class TestSharedBackends:
+
+    @staticmethod
+    def start_gunicorn(workers):
+        config = runpy.run_path(os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            'api_yamdb', 'gunicorn.conf.py'
+        ))
+        config['on_starting'](SimpleNamespace(
+            cfg=SimpleNamespace(workers=workers)
+        ))
+
+    def test_defaults_are_shared(self):
+        self.start_gunicorn(workers=4)
+
+    def test_local_cache_with_many_workers(self, monkeypatch):
+        from api import cache
+
+        monkeypatch.setattr(cache, 'user_cache', cache.LocMemBackend())
+        with pytest.raises(ImproperlyConfigured, match='API_USER_CACHE'):
+            self.start_gunicorn(workers=4)
+        self.start_gunicorn(workers=1)
+
+    def test_django_locmem_is_local(self, settings):
+        from api.cache import DjangoCacheBackend, is_process_local
+
+        settings.CACHES = {
+            **settings.CACHES,
+            'local': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            },
+        }
+        assert is_process_local(DjangoCacheBackend(alias='local'))
+        assert not is_process_local(DjangoCacheBackend())
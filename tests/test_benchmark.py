@@ -0,0 +1,25 @@
+import pytest
+
+from api.benchmark import LocalTransport, compare, run_benchmark, seed
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+class TestBenchmark:
+
+    def test_benchmark_covers_all_endpoints(self):
+        data = seed(titles=3, reviews_per_title=2, comments_per_review=2)
+        results = run_benchmark(
+            LocalTransport(), data, iterations=2, warmup=0
+        )
+
+        assert len(results) == 24
+        for row in results:
+            assert set(row['statuses']) <= {'200', '201'}, (
+                f'Эндпоинт {row["endpoint"]} вернул {row["statuses"]}'
+            )
+            assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms']
+        assert compare(results, {'results': results})[0]['p50_change'] == 0
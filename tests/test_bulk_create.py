@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+def titles_payload(count, genres=('drama', 'comedy')):
+    return [
+        {
+            'name': f'Пакетное произведение {number}',
+            'year': 2001,
+            'category': 'movie',
+            'genre': list(genres),
+        }
+        for number in range(count)
+    ]
+
+
+class TestBulkCreate:
+    """Список в POST создаётся одной пачкой."""
+
+    def test_categories_and_genres(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/',
+            [{'name': 'Книга', 'slug': 'book'},
+             {'name': 'Музыка', 'slug': 'music'}],
+            format='json'
+        )
+        assert response.status_code == 201
+        assert response.json() == [
+            {'name': 'Книга', 'slug': 'book'},
+            {'name': 'Музыка', 'slug': 'music'},
+        ]
+        response = admin_client.post(
+            '/api/v1/genres/', [{'name': 'Рок', 'slug': 'rock'}],
+            format='json'
+        )
+        assert response.status_code == 201
+        assert Genre.objects.filter(slug='rock').exists()
+
+    def test_titles_with_genres(self, admin_client, catalogue):
+        response = admin_client.post(
+            '/api/v1/titles/', titles_payload(3), format='json'
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert len(data) == 3
+        assert data[0]['genre'] == ['drama', 'comedy']
+        title = Title.objects.get(pk=data[0]['id'])
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }
+
+    def test_query_count_does_not_grow(self, admin_client, catalogue):
+        admin_client.get('/api/v1/users/me/')
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    '/api/v1/titles/', titles_payload(size), format='json'
+                )
+            assert response.status_code == 201
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Число запросов не должно зависеть от размера пачки'
+        )
+
+    def test_errors_by_position(self, admin_client, catalogue):
+        payload = titles_payload(3)
+        payload[1]['genre'] = ['drama', 'unknown']
+        payload[2]['year'] = 'год'
+        response = admin_client.post(
+            '/api/v1/titles/', payload, format='json'
+        )
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'genre' in errors[1]
+        assert 'year' in errors[2]
+        assert not Title.objects.filter(
+            name__startswith='Пакетное').exists(), (
+            'При ошибке в одном элементе не создаётся ни один'
+        )
+
+    def test_duplicate_slugs(self, admin_client, catalogue):
+        response = admin_client.post(
+            '/api/v1/categories/',
+            [{'name': 'Фильм', 'slug': 'movie'},
+             {'name': 'Новая', 'slug': 'new'},
+             {'name': 'Новая ещё раз', 'slug': 'new'}],
+            format='json'
+        )
+        assert response.status_code == 400
+        errors = response.json()
+        assert 'slug' in errors[0], 'Слаг уже есть в базе'
+        assert errors[1] == {}
+        assert 'slug' in errors[2], 'Слаг повторяется в пачке'
+        assert not Category.objects.filter(slug='new').exists()
+
+    def test_only_admin(self, user_client):
+        response = user_client.post(
+            '/api/v1/genres/', [{'name': 'Рок', 'slug': 'rock'}],
+            format='json'
+        )
+        assert response.status_code == 403
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api import cache as cache_module
+from api.cache import DjangoCacheBackend, LocMemBackend, ResponseCache
+
+
+def make_request(path='/api/v1/titles/'):
+    request = Request(APIRequestFactory().get(path))
+    request.accepted_media_type = 'application/json'
+    return request
+
+
+class TestLocMemBackend:
+
+    def test_lru_eviction(self):
+        backend = LocMemBackend(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        assert backend.get('a') == 1
+        backend.set('c', 3)
+        assert backend.get('b') is None, (
+            'При переполнении вытесняется давно не читанная запись'
+        )
+        assert backend.get('a') == 1
+        assert backend.get('c') == 3
+
+    def test_ttl(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+        backend = LocMemBackend(timeout=60)
+        backend.set('key', 'value')
+        now[0] += 59
+        assert backend.get('key') == 'value'
+        now[0] += 2
+        assert backend.get('key') is None, 'Запись живёт не дольше timeout'
+
+    def test_counters_are_not_evicted(self):
+        backend = LocMemBackend(max_entries=1)
+        backend.set_counter('version', 5)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        assert backend.get_counter('version') == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('clear_caches')
+class TestResponseCache:
+
+    @staticmethod
+    def worker():
+        """Кэш ответов отдельного воркера: тела свои, версия общая."""
+        return ResponseCache(
+            LocMemBackend(), DjangoCacheBackend(prefix='response')
+        )
+
+    def test_invalidate_across_workers(self):
+        first, second = self.worker(), self.worker()
+        request = make_request()
+        key = first.make_key(request)
+        first.set(key, {'count': 0})
+        assert first.get(key) == {'count': 0}
+
+        second.invalidate()
+        new_key = first.make_key(request)
+        assert new_key != key, (
+            'Сброс в одном воркере должен менять версию во всех'
+        )
+        assert first.get(new_key) is None
+        assert time.time() - first.invalidated_at() < 5
+
+    def test_api_write_in_other_worker(self, anonymous_client):
+        from reviews.models import Category
+
+        url = '/api/v1/categories/'
+        assert anonymous_client.get(url).json()['count'] == 0
+        Category.objects.create(name='Кино', slug='movie')
+        assert anonymous_client.get(url).json()['count'] == 0
+        self.worker().invalidate()
+        assert anonymous_client.get(url).json()['count'] == 1, (
+            'Запись через другой воркер должна сбрасывать кэш этого'
+        )
+
+    def test_stats(self):
+        cache = self.worker()
+        request = make_request()
+        cache.get(cache.make_key(request))
+        cache.set(cache.make_key(request), {})
+        cache.get(cache.make_key(request))
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        version = cache.invalidate()
+        assert cache.stats()['version'] == version
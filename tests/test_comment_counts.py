@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def review(user):
+    from reviews.models import Review, Title
+
+    title = Title.objects.create(name='Фильм', year=2000)
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+def comment(review, author, text='Комментарий', days_ago=0):
+    from reviews.models import Comment
+
+    created = Comment.objects.create(review=review, author=author, text=text)
+    if days_ago:
+        pub_date = datetime.now() - timedelta(days=days_ago)
+        Comment.objects.filter(pk=created.pk).update(pub_date=pub_date)
+        created.pub_date = pub_date
+    return created
+
+
+def activity(review):
+    review.refresh_from_db()
+    return review.comments_count, review.last_comment_at
+
+
+class TestCommentCounters:
+
+    def test_create_via_api(self, user_client, review):
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        )
+        modified = review.modified
+        for text in ('Первый', 'Второй'):
+            assert user_client.post(url, {'text': text}).status_code == 201
+        latest = review.comments.latest('pub_date')
+
+        response = user_client.get(f'/api/v1/titles/{review.title_id}/reviews/')
+        data = response.json()['results'][0]
+        assert data['comments_count'] == 2
+        assert data['last_comment_at'] is not None
+        assert activity(review) == (2, latest.pub_date)
+        assert review.modified > modified, (
+            'Новый комментарий должен менять ETag отзыва'
+        )
+
+    def test_delete_restores_previous_time(self, review, user, moderator):
+        older = comment(review, user, days_ago=2)
+        newer = comment(review, moderator)
+        assert activity(review) == (2, newer.pub_date)
+        newer.delete()
+        assert activity(review) == (1, older.pub_date)
+        older.delete()
+        assert activity(review) == (0, None)
+
+    def test_cascade_with_author(self, review, user, moderator):
+        kept = comment(review, user, days_ago=1)
+        comment(review, moderator)
+        moderator.delete()
+        assert activity(review) == (1, kept.pub_date), (
+            'Каскадное удаление автора должно уменьшать счётчик'
+        )
+
+    def test_move_between_reviews(self, review, user, moderator):
+        from reviews.models import Review
+
+        other = Review.objects.create(
+            title=review.title, author=moderator, text='Другой', score=3
+        )
+        moved = comment(review, user)
+        moved.review = other
+        moved.save()
+        assert activity(review) == (0, None)
+        assert activity(other) == (1, moved.pub_date)
+
+    def test_list_does_not_query_comments(self, user_client, review, user):
+        from reviews.models import Comment
+
+        for _ in range(3):
+            comment(review, user)
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/'
+            )
+        assert response.status_code == 200
+        table = Comment._meta.db_table
+        assert not any(table in query['sql'] for query in queries), (
+            'Число комментариев должно браться из самого отзыва'
+        )
+
+
+class TestRebuildCommentCounts:
+
+    def test_check_and_rebuild(self, review, user):
+        from reviews.models import Review
+
+        latest = comment(review, user)
+        Review.objects.filter(pk=review.pk).update(
+            comments_count=5, last_comment_at=None
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_comment_counts', '--check')
+
+        call_command('rebuild_comment_counts', '--batch-size', '1')
+        assert activity(review) == (1, latest.pub_date)
+        call_command('rebuild_comment_counts', '--check')
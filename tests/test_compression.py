@@ -0,0 +1,113 @@
+import gzip
+
+import pytest
+from django.test import override_settings
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Title
+
+    return [
+        Title.objects.create(
+            name=f'Фильм {number}', year=2000, description='Описание ' * 50
+        )
+        for number in range(5)
+    ]
+
+
+def body(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+class TestCompression:
+
+    def test_gzip(self, anonymous_client, titles):
+        plain = anonymous_client.get(TITLES_URL)
+        response = anonymous_client.get(
+            TITLES_URL, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content)
+        assert len(response.content) < len(plain.content) / 3
+        assert gzip.decompress(response.content) == plain.content
+
+    def test_brotli_preferred(self, anonymous_client, titles):
+        brotli = pytest.importorskip('brotli')
+        plain = anonymous_client.get(TITLES_URL)
+        response = anonymous_client.get(
+            TITLES_URL, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == plain.content
+
+        response = anonymous_client.get(
+            TITLES_URL, HTTP_ACCEPT_ENCODING='br;q=0.1, gzip'
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Кодировка выбирается по весам q из Accept-Encoding'
+        )
+
+    @pytest.mark.parametrize('header', ['', 'identity', 'gzip;q=0'])
+    def test_not_accepted(self, anonymous_client, titles, header):
+        response = anonymous_client.get(
+            TITLES_URL, HTTP_ACCEPT_ENCODING=header
+        )
+        assert not response.has_header('Content-Encoding')
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_small_body(self, anonymous_client):
+        response = anonymous_client.get(
+            '/api/v1/categories/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response.status_code == 200
+        assert not response.has_header('Content-Encoding'), (
+            'Ответы меньше API_COMPRESS_MIN_SIZE не сжимаются'
+        )
+
+    @override_settings(API_COMPRESS_MIN_SIZE=0)
+    def test_weak_etag(self, anonymous_client, titles):
+        url = f'{TITLES_URL}{titles[0].pk}/'
+        response = anonymous_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['ETag'].startswith('W/"'), (
+            'У сжатого ответа ETag должен стать слабым'
+        )
+        response = anonymous_client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert response.status_code == 304
+
+    def test_streaming(self, admin_client, titles):
+        url = '/api/v1/export/titles/?output=ndjson'
+        plain = body(admin_client.get(url))
+        response = admin_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.streaming
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(body(response)) == plain
+
+    def test_metrics(self, anonymous_client, admin_client, titles):
+        anonymous_client.get(TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        anonymous_client.get('/api/v1/genres/', HTTP_ACCEPT_ENCODING='gzip')
+        metrics = admin_client.get('/metrics').content.decode()
+        labels = '{encoding="gzip",view="titles-list"}'
+        for name in ('yamdb_compression_input_bytes_total',
+                     'yamdb_compression_output_bytes_total',
+                     'yamdb_compression_ratio_count',
+                     'yamdb_compression_cpu_seconds_count'):
+            assert f'{name}{labels}' in metrics
+        assert (
+            'yamdb_compression_skipped_total'
+            '{reason="small",view="genres-list"}'
+        ) in metrics
@@ -0,0 +1,83 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+class TestConditionalGet:
+    """Неизменившиеся ресурсы отдаются ответом 304 без тела."""
+
+    def test_title_detail_not_modified(self, anonymous_client, catalogue,
+                                       django_assert_num_queries):
+        url = f'/api/v1/titles/{catalogue["titles"][0].id}/'
+        response = anonymous_client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        with django_assert_num_queries(1):
+            response = anonymous_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Совпадающий If-None-Match должен давать 304'
+        )
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_title_detail_if_modified_since(self, anonymous_client,
+                                            catalogue):
+        url = f'/api/v1/titles/{catalogue["titles"][0].id}/'
+        response = anonymous_client.get(url)
+        response = anonymous_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_review_changes_title_etag(self, anonymous_client, user_client,
+                                       catalogue):
+        title = catalogue['titles'][0]
+        url = f'/api/v1/titles/{title.id}/'
+        reviews_url = f'{url}reviews/'
+        title_etag = anonymous_client.get(url)['ETag']
+        reviews_etag = anonymous_client.get(reviews_url)['ETag']
+        response = user_client.post(
+            reviews_url, {'text': 'Новый отзыв', 'score': 1}, format='json'
+        )
+        assert response.status_code == 201
+        response = anonymous_client.get(url, HTTP_IF_NONE_MATCH=title_etag)
+        assert response.status_code == 200, (
+            'Новый отзыв меняет рейтинг, а значит и ETag произведения'
+        )
+        response = anonymous_client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=reviews_etag
+        )
+        assert response.status_code == 200
+
+    def test_genre_delete_changes_title_etag(self, anonymous_client,
+                                             admin_client, catalogue):
+        url = f'/api/v1/titles/{catalogue["titles"][0].id}/'
+        etag = anonymous_client.get(url)['ETag']
+        response = admin_client.delete('/api/v1/genres/drama/')
+        assert response.status_code == 204
+        response = anonymous_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Удаление жанра меняет вывод произведения и его ETag'
+        )
+
+    def test_list_etag_depends_on_page(self, anonymous_client, catalogue,
+                                       django_assert_num_queries):
+        review = catalogue['reviews'][0]
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            f'/comments/'
+        )
+        first = anonymous_client.get(url)['ETag']
+        second = anonymous_client.get(f'{url}?offset=5')['ETag']
+        assert first != second, 'У разных страниц должны быть разные ETag'
+        with django_assert_num_queries(1):
+            response = anonymous_client.get(url, HTTP_IF_NONE_MATCH=first)
+        assert response.status_code == 304
+        catalogue['comments'][-1].delete()
+        response = anonymous_client.get(url, HTTP_IF_NONE_MATCH=first)
+        assert response.status_code == 200, (
+            'Удаление комментария должно менять ETag списка'
+        )
@@ -0,0 +1,38 @@
+import psycopg2
+import pytest
+from django.db import connection
+
+from api.cache import response_cache
+
+
+def terminate_backend(pid):
+    with psycopg2.connect(**connection.get_connection_params()) as other:
+        with other.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+    other.close()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('clear_caches')
+class TestPersistentConnections:
+    """Постоянное соединение проверяется перед каждым запросом."""
+
+    def test_connection_is_reused(self, anonymous_client):
+        assert connection.settings_dict['CONN_MAX_AGE'] > 0
+        anonymous_client.get('/api/v1/categories/')
+        pid = connection.connection.get_backend_pid()
+        anonymous_client.get('/api/v1/genres/')
+        assert connection.connection.get_backend_pid() == pid, (
+            'Соединение должно переживать запрос при CONN_MAX_AGE > 0'
+        )
+
+    def test_dropped_connection_is_replaced(self, anonymous_client):
+        anonymous_client.get('/api/v1/categories/')
+        pid = connection.connection.get_backend_pid()
+        terminate_backend(pid)
+        response_cache.backend.clear()
+        response = anonymous_client.get('/api/v1/categories/')
+        assert response.status_code == 200, (
+            'Закрытое сервером соединение должно заменяться новым'
+        )
+        assert connection.connection.get_backend_pid() != pid
@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = pytest.mark.django_db
+
+EXPORT_URL = '/api/v1/export/{}/'
+
+
+@pytest.fixture
+def catalogue(user):
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = [
+        Title.objects.create(name=f'Фильм {number}', year=2000 + number,
+                             category=movie)
+        for number in range(3)
+    ]
+    titles[0].genre.add(drama, comedy)
+    review = Review.objects.create(
+        title=titles[0], author=user, text='Отзыв, "с кавычками"', score=8
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return titles
+
+
+def content(response):
+    assert response.streaming, 'Выгрузка должна отдаваться потоком'
+    return b''.join(response.streaming_content).decode()
+
+
+def ndjson(response):
+    return [json.loads(line) for line in content(response).splitlines()]
+
+
+class TestExportEndpoint:
+
+    def test_admin_only(self, anonymous_client, user_client, admin_client):
+        url = EXPORT_URL.format('titles')
+        assert anonymous_client.get(url).status_code == 401, (
+            'Аноним не должен получать выгрузку'
+        )
+        assert user_client.get(url).status_code == 403, (
+            'Выгрузка доступна только администратору'
+        )
+        assert admin_client.get(url).status_code == 200
+
+    def test_unknown_dataset(self, admin_client):
+        response = admin_client.get(EXPORT_URL.format('users'))
+        assert response.status_code == 404
+
+    def test_titles_ndjson(self, admin_client, catalogue):
+        response = admin_client.get(EXPORT_URL.format('titles'))
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert 'titles.ndjson' in response['Content-Disposition']
+        rows = ndjson(response)
+        assert [row['id'] for row in rows] == [
+            title.pk for title in catalogue
+        ], 'Строки должны идти по возрастанию id'
+        assert rows[0]['name'] == 'Фильм 0'
+        assert rows[0]['category'] == 'movie'
+        assert rows[0]['genre'] == 'comedy,drama', (
+            'Жанры выгружаются слагами через запятую'
+        )
+        assert rows[0]['rating'] == 8
+        assert rows[0]['reviews_count'] == 1
+        assert rows[1]['genre'] is None
+
+    def test_reviews_csv(self, admin_client, catalogue, user):
+        response = admin_client.get(
+            EXPORT_URL.format('reviews'), {'output': 'csv'}
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        assert len(rows) == 1
+        assert rows[0]['title'] == str(catalogue[0].pk)
+        assert rows[0]['author'] == user.username
+        assert rows[0]['text'] == 'Отзыв, "с кавычками"'
+        assert datetime.fromisoformat(rows[0]['pub_date'])
+
+    def test_comments(self, admin_client, catalogue):
+        rows = ndjson(admin_client.get(EXPORT_URL.format('comments')))
+        assert len(rows) == 1
+        assert rows[0]['title'] == catalogue[0].pk
+
+    def test_resume_after_id(self, admin_client, catalogue):
+        response = admin_client.get(
+            EXPORT_URL.format('titles'), {'after_id': catalogue[0].pk}
+        )
+        assert [row['id'] for row in ndjson(response)] == [
+            title.pk for title in catalogue[1:]
+        ], 'after_id должен пропускать уже выгруженные записи'
+
+    def test_since(self, admin_client, catalogue):
+        from reviews.models import Title
+
+        Title.objects.filter(pk=catalogue[2].pk).update(
+            modified=datetime.now() + timedelta(hours=1)
+        )
+        response = admin_client.get(
+            EXPORT_URL.format('titles'),
+            {'since': (datetime.now() + timedelta(minutes=30)).isoformat()}
+        )
+        assert [row['id'] for row in ndjson(response)] == [catalogue[2].pk]
+
+    @pytest.mark.parametrize('params', (
+        {'output': 'xml'}, {'after_id': 'abc'}, {'since': 'вчера'},
+    ))
+    def test_bad_params(self, admin_client, params):
+        response = admin_client.get(EXPORT_URL.format('titles'), params)
+        assert response.status_code == 400
+
+
+class TestExportCommand:
+
+    def test_writes_file_and_resumes(self, catalogue, tmp_path):
+        path = tmp_path / 'titles.csv'
+        report = io.StringIO()
+        call_command(
+            'export_data', 'titles', '--output', str(path),
+            '--after-id', str(catalogue[0].pk), stdout=report
+        )
+        assert f'последний id: {catalogue[2].pk}' in report.getvalue()
+        call_command(
+            'export_data', 'titles', '--output', str(path), '--append',
+            '--after-id', str(catalogue[2].pk), stdout=report
+        )
+        with open(path, encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        assert [row['id'] for row in rows] == [
+            str(title.pk) for title in catalogue[1:]
+        ], 'Продолжение не должно дублировать заголовок или строки'
+
+
+class TestExportMemory:
+
+    @staticmethod
+    def peak(count):
+        from reviews.exporter import Exporter
+        from reviews.models import Title
+
+        Title.objects.all().delete()
+        Title.objects.bulk_create(
+            (Title(name=f'Произведение {number}', year=2000,
+                   description='Описание ' * 10)
+             for number in range(count)),
+            batch_size=5000
+        )
+        tracemalloc.start()
+        try:
+            for _ in Exporter('titles', chunk_size=500).export('ndjson'):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_memory_does_not_grow_with_rows(self):
+        small = self.peak(1000)
+        large = self.peak(20000)
+        assert large < small * 2, (
+            f'Пиковая память выросла с {small} до {large} байт: '
+            'выгрузка не должна держать все строки в памяти'
+        )
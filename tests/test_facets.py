@@ -0,0 +1,178 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+URL = '/api/v1/titles/facets/'
+
+
+@pytest.fixture
+def shelf():
+    from reviews.models import Category, Genre, Title
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    rows = (
+        (movie, 2000, [drama, comedy]),
+        (movie, 2000, [drama]),
+        (movie, 2010, [comedy]),
+        (book, 2010, [drama]),
+        (None, 2020, []),
+    )
+    for number, (category, year, genres) in enumerate(rows):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=year, category=category
+        )
+        title.genre.set(genres)
+
+
+def counts(items, key='slug'):
+    return {item[key]: item['count'] for item in items}
+
+
+class TestTitleFacets:
+    """Счётчики фасетов для фильтров списка произведений."""
+
+    def test_unfiltered_counts(self, anonymous_client, shelf):
+        response = anonymous_client.get(URL)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 5
+        assert counts(data['genre']) == {'comedy': 2, 'drama': 3}
+        assert counts(data['category']) == {'book': 1, 'movie': 3}
+        assert counts(data['year'], 'year') == {2000: 2, 2010: 2, 2020: 1}
+        assert data['genre'][0] == {
+            'slug': 'comedy', 'name': 'Комедия', 'count': 2
+        }
+
+    def test_facet_ignores_own_filter(self, anonymous_client, shelf):
+        data = anonymous_client.get(
+            URL, {'genre': 'drama', 'category': 'movie'}
+        ).json()
+        assert data['count'] == 2, 'Итог учитывает все фильтры'
+        assert counts(data['genre']) == {'comedy': 2, 'drama': 2}, (
+            'Жанры считаются без фильтра по жанру'
+        )
+        assert counts(data['category']) == {'book': 1, 'movie': 2}, (
+            'Категории считаются без фильтра по категории'
+        )
+        assert counts(data['year'], 'year') == {2000: 2}
+
+    def test_year_range(self, anonymous_client, shelf):
+        data = anonymous_client.get(URL, {'year_min': 2010}).json()
+        assert data['count'] == 3
+        assert counts(data['category']) == {'book': 1, 'movie': 1}
+        assert counts(data['year'], 'year') == {2000: 2, 2010: 2, 2020: 1}
+
+    def test_invalid_filter(self, anonymous_client, shelf):
+        response = anonymous_client.get(URL, {'year': 'давно'})
+        assert response.status_code == 400
+
+    def test_single_call_is_cheap(self, anonymous_client, shelf,
+                                  django_assert_num_queries):
+        # К каждому запросу добавляется чтение версии кэша ответов.
+        with django_assert_num_queries(4):
+            anonymous_client.get(URL)
+        with django_assert_num_queries(6):
+            anonymous_client.get(URL, {'genre': 'drama'})
+        with django_assert_num_queries(1):
+            response = anonymous_client.get(URL, {'genre': 'drama'})
+        assert response.json()['count'] == 3, (
+            'Повторный запрос отдаётся из кэша ответов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cache_follows_catalogue_changes(self, anonymous_client, shelf):
+        from reviews.models import Genre, Title
+
+        data = anonymous_client.get(URL).json()
+        assert 'horror' not in counts(data['genre']), (
+            'Жанры без произведений в фасетах не показываются'
+        )
+        horror = Genre.objects.create(name='Ужасы', slug='horror')
+        Title.objects.first().genre.add(horror)
+        data = anonymous_client.get(URL).json()
+        assert counts(data['genre'])['horror'] == 1, (
+            'Изменение каталога сбрасывает закэшированные фасеты'
+        )
+
+
+@pytest.mark.usefixtures('shelf')
+class TestFacetCounters:
+    """Счётчики фасетов не расходятся с каталогом после изменений."""
+
+    def assert_fresh(self):
+        from reviews.facets import stale_facets
+
+        assert stale_facets() == [], 'Счётчики разошлись с каталогом'
+
+    def test_filled_by_signals(self):
+        from reviews.models import FacetCount
+
+        self.assert_fresh()
+        assert FacetCount.objects.get(facet='year', value=2000).count == 2
+
+    def test_title_changes(self):
+        from reviews.models import Category, Title
+
+        title = Title.objects.get(name='Произведение 0')
+        title.year = 2030
+        title.category = Category.objects.get(slug='book')
+        title.save()
+        self.assert_fresh()
+        Title.objects.get(name='Произведение 1').delete()
+        self.assert_fresh()
+
+    def test_genre_links(self):
+        from reviews.models import Genre, Title
+
+        title = Title.objects.get(name='Произведение 4')
+        drama, comedy = Genre.objects.order_by('slug').reverse()
+        title.genre.add(drama, comedy)
+        title.genre.add(drama)
+        self.assert_fresh()
+        title.genre.remove(drama)
+        title.genre.remove(drama)
+        self.assert_fresh()
+        comedy.titles.remove(title)
+        comedy.titles.add(*Title.objects.all())
+        self.assert_fresh()
+        comedy.titles.clear()
+        title.genre.set([drama])
+        Title.objects.get(name='Произведение 0').genre.clear()
+        self.assert_fresh()
+
+    def test_catalogue_deletes(self):
+        from reviews.models import Category, FacetCount, Genre
+
+        Category.objects.get(slug='movie').delete()
+        Genre.objects.get(slug='drama').delete()
+        self.assert_fresh()
+        assert not FacetCount.objects.filter(facet='genre').exclude(
+            value=Genre.objects.get(slug='comedy').pk
+        ).exists()
+
+    def test_bulk_create(self, admin_client):
+        response = admin_client.post('/api/v1/titles/', [
+            {'name': 'Новое 1', 'year': 2000, 'category': 'book',
+             'genre': ['drama', 'comedy']},
+            {'name': 'Новое 2', 'year': 1999, 'category': 'book',
+             'genre': ['drama']},
+        ], format='json')
+        assert response.status_code == 201
+        self.assert_fresh()
+
+    def test_rebuild_command(self):
+        from django.core.management import CommandError, call_command
+
+        from reviews.models import FacetCount
+
+        FacetCount.objects.filter(facet='year').update(count=100)
+        with pytest.raises(CommandError):
+            call_command('rebuild_facets', '--check')
+        call_command('rebuild_facets')
+        call_command('rebuild_facets', '--check')
@@ -0,0 +1,212 @@
+import csv
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+
+pytestmark = pytest.mark.django_db
+
+DATA = {
+    'users': (
+        ('id', 'username', 'email', 'role'),
+        [(101, 'reader', 'reader@yamdb.fake', 'user'),
+         (102, 'critic', 'critic@yamdb.fake', 'moderator')],
+    ),
+    'categories': (
+        ('id', 'name', 'slug'),
+        [(1, 'Фильм', 'movie'), (2, 'Книга', 'book')],
+    ),
+    'genres': (
+        ('id', 'name', 'slug'),
+        [(1, 'Драма', 'drama'), (2, 'Комедия', 'comedy')],
+    ),
+    'titles': (
+        ('id', 'name', 'year', 'category'),
+        [(1, 'Фильм 1', 2000, 1), (2, 'Фильм 2', 2000, 1),
+         (3, 'Книга', 1999, 2)],
+    ),
+    'genre_title': (
+        ('id', 'title_id', 'genre_id'),
+        [(1, 1, 1), (2, 1, 2), (3, 2, 1)],
+    ),
+    'reviews': (
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        [(1, 1, 'Отлично', 101, 10, '2021-01-01T10:00:00'),
+         (2, 1, 'Так себе', 102, 4, '2021-01-02T10:00:00'),
+         (3, 2, 'Неплохо', 101, 7, '2021-01-03T10:00:00'),
+         (4, 3, 'Скучно', 101, 2, '2021-01-04T10:00:00'),
+         (5, 3, 'Читал\tдважды', 102, 6, '2021-01-05T10:00:00')],
+    ),
+    'comments': (
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        [(1, 1, 'Согласен', 102, '2021-02-01T10:00:00'),
+         (2, 1, 'Нет', 101, '2021-02-02T10:00:00'),
+         (3, 4, 'Почему?', 102, '2021-02-03T10:00:00')],
+    ),
+}
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    return {
+        dataset: write_csv(tmp_path / f'{dataset}.csv', header, rows)
+        for dataset, (header, rows) in DATA.items()
+    }
+
+
+def load(files, *datasets, batch_size=2):
+    for dataset in datasets:
+        call_command(
+            'import_data', dataset, files[dataset],
+            '--batch-size', str(batch_size)
+        )
+
+
+class TestImport:
+
+    def test_copy_and_after_batch(self, files, monkeypatch):
+        from reviews.activity import stale_comment_counts
+        from reviews.facets import stale_facets
+        from reviews.importer import Importer
+        from reviews.models import Comment, FacetCount, Review, Title
+        from reviews.ratings import stale_ratings
+
+        copied = []
+        copy = Importer.copy
+
+        def spy(importer, rows):
+            copied.append(importer.model)
+            copy(importer, rows)
+
+        monkeypatch.setattr(Importer, 'copy', spy)
+        load(files, *DATA)
+        assert {Title, Title.genre.through, Review, Comment} <= set(copied), (
+            'На Postgres пачки должны загружаться командой COPY'
+        )
+
+        assert Review.objects.get(pk=5).text == 'Читал\tдважды'
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        assert ratings == {1: 7, 2: 7, 3: 4}, (
+            'После пачки отзывов рейтинги пересчитываются'
+        )
+        assert not stale_ratings().exists()
+        assert dict(Review.objects.values_list('pk', 'comments_count')) == {
+            1: 2, 2: 0, 3: 0, 4: 1, 5: 0
+        }, 'После пачки комментариев пересчитываются их счётчики'
+        assert not stale_comment_counts().exists()
+        assert stale_facets() == [], (
+            'Фасеты должны учитывать произведения и жанры из COPY'
+        )
+        assert FacetCount.objects.get(facet='genre', value=1).count == 2
+
+        Title.objects.create(name='Новый', year=2021)
+        assert Title.objects.count() == 4, (
+            'После загрузки с id последовательность сдвигается'
+        )
+
+    def test_resume_after_failure(self, files, monkeypatch, capsys):
+        from reviews.importer import Importer
+        from reviews.models import Review, Title
+        from reviews.ratings import stale_ratings
+
+        load(files, 'users', 'categories', 'titles')
+        after_batch = Importer.after_batch
+        calls = []
+
+        def fail_second(importer, rows):
+            calls.append(len(rows))
+            after_batch(importer, rows)
+            if len(calls) == 2:
+                raise DatabaseError('соединение потеряно')
+
+        monkeypatch.setattr(Importer, 'after_batch', fail_second)
+        with pytest.raises(CommandError, match='со строки 3'):
+            load(files, 'reviews')
+        assert list(Review.objects.values_list('pk', flat=True)) == [1, 2], (
+            'Пачка, упавшая посередине, должна откатываться целиком'
+        )
+        assert not stale_ratings().exists()
+        with open(f'{files["reviews"]}.progress') as checkpoint:
+            assert '"rows": 2' in checkpoint.read()
+
+        monkeypatch.setattr(Importer, 'after_batch', after_batch)
+        load(files, 'reviews')
+        assert 'Продолжаем с строки 3' in capsys.readouterr().out
+        assert Review.objects.count() == 5
+        assert Title.objects.get(pk=3).rating == 4
+        assert not stale_ratings().exists()
+        with pytest.raises(FileNotFoundError):
+            open(f'{files["reviews"]}.progress')
+
+    def test_restart(self, files):
+        from reviews.importer import Checkpoint
+        from reviews.models import Category
+
+        Checkpoint(f'{files["categories"]}.progress').save(2)
+        call_command(
+            'import_data', 'categories', files['categories'], '--restart'
+        )
+        assert Category.objects.count() == 2
+
+
+class TestBadRows:
+
+    def test_invalid_value(self, files, tmp_path):
+        from reviews.models import Review
+
+        load(files, 'users', 'categories', 'titles')
+        path = write_csv(
+            tmp_path / 'bad.csv', DATA['reviews'][0],
+            [(1, 1, 'Ок', 101, 5, ''), (2, 1, 'Ок', 102, 'много', '')]
+        )
+        with pytest.raises(CommandError, match='score'):
+            call_command('import_data', 'reviews', path)
+        assert not Review.objects.exists()
+
+    def test_unknown_column(self, tmp_path):
+        path = write_csv(
+            tmp_path / 'bad.csv', ('id', 'name', 'slug', 'colour'),
+            [(1, 'Фильм', 'movie', 'red')]
+        )
+        with pytest.raises(CommandError, match='colour'):
+            call_command('import_data', 'categories', path)
+
+    def test_duplicate_rejects_batch(self, files):
+        from reviews.models import Category
+
+        load(files, 'categories')
+        with pytest.raises(CommandError, match='со строки 1'):
+            call_command(
+                'import_data', 'categories', files['categories'],
+                '--restart'
+            )
+        assert Category.objects.count() == 2
+
+    def test_bad_json(self, tmp_path):
+        path = tmp_path / 'genres.ndjson'
+        path.write_text('{"name": "Драма", "slug": "drama"}\n{oops\n')
+        with pytest.raises(CommandError, match='Строка 2'):
+            call_command('import_data', 'genres', str(path))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_missing_foreign_key(files, tmp_path):
+    """Внешние ключи COPY проверяются при фиксации пачки."""
+    from reviews.models import Review
+
+    load(files, 'users', 'categories', 'titles')
+    path = write_csv(
+        tmp_path / 'orphans.csv', DATA['reviews'][0],
+        [(1, 999, 'Ок', 101, 5, '')]
+    )
+    with pytest.raises(CommandError, match='не загружена'):
+        call_command('import_data', 'reviews', path)
+    assert not Review.objects.exists()
@@ -0,0 +1,133 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+@pytest.fixture
+def board(django_user_model):
+    """Произведения с разными оценками и давностью отзывов."""
+    from reviews.models import Category, Genre, Review, Title
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+        )
+        for number in range(3)
+    ]
+    titles = {}
+    for name, category, scores in (
+            ('old_hit', movie, (9, 9, 9)),
+            ('fresh', book, (7,)),
+            ('average', movie, (5, 6)),
+            ('unrated', book, ())):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        if category is book:
+            title.genre.add(drama)
+        for author, score in zip(authors, scores):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        titles[name] = title
+    Review.objects.filter(title=titles['old_hit']).update(
+        pub_date=datetime.now() - timedelta(days=30)
+    )
+    return titles
+
+
+def names(response):
+    assert response.status_code == 200
+    return [item['name'] for item in response.json()]
+
+
+def rebuild():
+    from reviews.ratings import rebuild_ratings
+
+    rebuild_ratings()
+
+
+class TestTopRated:
+    """Лучшие произведения по рейтингу."""
+
+    def test_order_by_rating(self, anonymous_client, board):
+        response = anonymous_client.get('/api/v1/titles/top/')
+        assert names(response) == ['old_hit', 'fresh', 'average'], (
+            'Произведения без оценок в рейтинг не попадают'
+        )
+        assert response.json()[0]['rating'] == 9
+        assert set(response.json()[0]) == {
+            'id', 'category', 'genre', 'rating', 'name', 'year',
+            'description',
+        }
+
+    def test_scopes_and_limit(self, anonymous_client, board):
+        url = '/api/v1/titles/top/'
+        assert names(anonymous_client.get(url, {'category': 'movie'})) == [
+            'old_hit', 'average'
+        ]
+        assert names(anonymous_client.get(url, {'genre': 'drama'})) == [
+            'fresh'
+        ]
+        assert names(anonymous_client.get(url, {'limit': 1})) == ['old_hit']
+        response = anonymous_client.get(url, {'limit': 1000})
+        assert response.status_code == 400
+
+    def test_constant_query_count(self, anonymous_client, board,
+                                  django_assert_num_queries):
+        with django_assert_num_queries(3):
+            anonymous_client.get('/api/v1/titles/top/', {'genre': 'drama'})
+
+
+class TestTrending:
+    """Популярность затухает, поэтому свежие отзывы весят больше."""
+
+    def test_recent_reviews_win(self, anonymous_client, board):
+        rebuild()
+        response = anonymous_client.get('/api/v1/titles/trending/')
+        assert names(response) == ['average', 'fresh', 'old_hit'], (
+            'Месячной давности отзывы весят меньше одного свежего'
+        )
+
+    def test_incremental_matches_rebuild(self, board):
+        from reviews.models import Title
+
+        before = dict(Title.objects.values_list('name', 'trending_score'))
+        rebuild()
+        after = dict(Title.objects.values_list('name', 'trending_score'))
+        assert after['unrated'] is None
+        for name in ('fresh', 'average'):
+            assert after[name] == pytest.approx(before[name], abs=1e-3), (
+                'Сдвиг популярности при отзыве совпадает с пересчётом'
+            )
+
+    def test_log_space_sum(self, board, settings):
+        from reviews.ratings import trending_point
+
+        title = board['average']
+        title.refresh_from_db()
+        points = [
+            trending_point(review.pub_date) for review in title.reviews.all()
+        ]
+        expected = max(points) + math.log(sum(
+            math.exp(point - max(points)) for point in points
+        ))
+        assert title.trending_score == pytest.approx(expected)
+
+    def test_half_life(self, settings):
+        from reviews.ratings import trending_point
+
+        settings.TRENDING_HALF_LIFE_HOURS = 24
+        now = datetime(2026, 1, 2)
+        assert trending_point(now) - trending_point(
+            now - timedelta(days=1)
+        ) == pytest.approx(math.log(2)), (
+            'Отзыв суточной давности весит вдвое меньше свежего'
+        )
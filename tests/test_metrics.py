@@ -0,0 +1,57 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+
+class TestMetrics:
+
+    def test_server_timing_header(self, anonymous_client):
+        response = anonymous_client.get('/api/v1/categories/')
+
+        assert response.status_code == 200
+        header = response['Server-Timing']
+        for part in ('db;', 'app;', 'render;', 'total;'):
+            assert part in header, (
+                f'Проверьте, что заголовок Server-Timing содержит {part}'
+            )
+
+    def test_metrics_admin_only(self, anonymous_client, user_client,
+                                admin_client):
+        assert anonymous_client.get('/metrics').status_code == 401
+        assert user_client.get('/metrics').status_code == 403
+
+        anonymous_client.get('/api/v1/genres/')
+        response = admin_client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert (
+            'yamdb_request_duration_seconds_count'
+            '{method="GET",view="genres-list"}'
+        ) in body
+
+    def test_outbox_stats_once_per_scrape(self, admin_client, monkeypatch):
+        from api import metrics
+
+        calls = []
+
+        def stats():
+            calls.append(1)
+            return {
+                'pending': 3, 'dead': 1, 'oldest_pending_seconds': 5.0,
+                'latency_avg_seconds': 0.5,
+            }
+
+        group, = [
+            metric for metric in metrics.registry.metrics
+            if isinstance(metric, metrics.GaugeGroup)
+        ]
+        monkeypatch.setattr(group, 'function', stats)
+        body = admin_client.get('/metrics').content.decode()
+        assert len(calls) == 1, (
+            'Статистика очереди писем должна считаться один раз за опрос'
+        )
+        assert '# TYPE yamdb_outbox_pending gauge' in body
+        assert 'yamdb_outbox_pending 3' in body
+        assert 'yamdb_outbox_delivery_latency_seconds 0.5' in body
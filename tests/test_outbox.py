@@ -0,0 +1,180 @@
+import smtplib
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+FAILING_BACKEND = 'tests.test_outbox.FailingBackend'
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class FailingBackend(BaseEmailBackend):
+    """Почтовый сервер, который всегда недоступен."""
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('сервер недоступен')
+
+
+def queue(count=1):
+    from reviews.outbox import queue_email
+
+    return [
+        queue_email('Код', 'Тело', 'yamdb@yamdb.fake', f'{number}@yamdb.fake')
+        for number in range(count)
+    ]
+
+
+def make_due(*emails):
+    from reviews.models import OutgoingEmail
+
+    OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        next_attempt_at=timezone.now() - timedelta(seconds=1)
+    )
+
+
+@pytest.mark.django_db
+class TestDelivery:
+
+    def test_sent(self, settings):
+        from reviews.models import EMAIL_SENT
+        from reviews.outbox import claim_batch, deliver
+
+        settings.EMAIL_BACKEND = LOCMEM_BACKEND
+        email, = queue()
+        claimed, = claim_batch(10, lease=300)
+        assert deliver(claimed, max_attempts=3, backoff=30)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (EMAIL_SENT, 1)
+        assert email.sent_at is not None
+        assert mail.outbox[0].to == [email.recipient]
+
+    def test_backoff_and_dead_letter(self, settings):
+        from reviews.models import EMAIL_DEAD, EMAIL_PENDING
+        from reviews.outbox import claim_batch, deliver
+
+        settings.EMAIL_BACKEND = FAILING_BACKEND
+        email, = queue()
+        base = 30
+        for attempt in (1, 2):
+            claimed, = claim_batch(10, lease=300)
+            before = timezone.now()
+            assert not deliver(claimed, max_attempts=3, backoff=base)
+            email.refresh_from_db()
+            assert (email.status, email.attempts) == (EMAIL_PENDING, attempt)
+            assert 'сервер недоступен' in email.last_error
+            delay = (email.next_attempt_at - before).total_seconds()
+            ceiling = base * 2 ** (attempt - 1)
+            assert ceiling / 2 - 1 <= delay <= ceiling + 1, (
+                'Задержка повтора растёт вдвое с каждой попыткой'
+            )
+            assert claim_batch(10, lease=300) == [], (
+                'До срока повтора письмо не забирается'
+            )
+            make_due(email)
+
+        claimed, = claim_batch(10, lease=300)
+        assert not deliver(claimed, max_attempts=3, backoff=base)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (EMAIL_DEAD, 3), (
+            'После max_attempts неудач письмо уходит в недоставленные'
+        )
+        make_due(email)
+        assert claim_batch(10, lease=300) == []
+
+    def test_lease_expiry(self, monkeypatch):
+        from reviews import outbox
+
+        email, = queue()
+        claimed, = outbox.claim_batch(10, lease=60)
+        assert claimed.pk == email.pk
+        assert outbox.claim_batch(10, lease=60) == [], (
+            'Забранное письмо не выдаётся повторно до истечения аренды'
+        )
+        later = timezone.now() + timedelta(seconds=61)
+        monkeypatch.setattr(
+            outbox, 'timezone', SimpleNamespace(now=lambda: later)
+        )
+        claimed, = outbox.claim_batch(10, lease=60)
+        assert claimed.pk == email.pk, (
+            'Если воркер упал, письмо возвращается по истечении аренды'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentClaims:
+
+    def test_skip_locked(self):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import claim_batch
+
+        emails = queue(4)
+        locked, released = threading.Event(), threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    list(OutgoingEmail.objects.select_for_update().filter(
+                        pk__in=[email.pk for email in emails[:2]]
+                    ))
+                    locked.set()
+                    released.wait(10)
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        assert locked.wait(10)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SET lock_timeout = '2s'")
+            claimed = claim_batch(10, lease=300)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET lock_timeout')
+            released.set()
+            holder.join()
+        assert {email.pk for email in claimed} == {
+            email.pk for email in emails[2:]
+        }, 'Заблокированные строки пропускаются, а не ждут освобождения'
+
+    def test_claims_never_overlap(self):
+        from reviews.outbox import claim_batch
+
+        emails = queue(20)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def claim():
+            try:
+                barrier.wait(10)
+                results.append([email.pk for email in claim_batch(5, 300)])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        claimed = [pk for batch in results for pk in batch]
+        assert len(claimed) == len(set(claimed)), (
+            'Два воркера не должны забрать одно письмо'
+        )
+        rest = [email.pk for email in claim_batch(20, 300)]
+        assert sorted(claimed + rest) == [email.pk for email in emails]
+
+    def test_send_emails_dead_letters(self, settings):
+        from reviews.models import EMAIL_DEAD, OutgoingEmail
+
+        settings.EMAIL_BACKEND = FAILING_BACKEND
+        queue(3)
+        call_command('send_emails', '--once', '--max-attempts', '1')
+        assert set(OutgoingEmail.objects.values_list(
+            'status', 'attempts'
+        )) == {(EMAIL_DEAD, 1)}
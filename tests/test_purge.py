@@ -0,0 +1,168 @@
+import tracemalloc
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+@pytest.fixture
+def library(user, moderator):
+    """Два произведения с отзывами и комментариями разных авторов."""
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = []
+    for name in ('Удаляемое', 'Остающееся'):
+        title = Title.objects.create(name=name, year=2000, category=movie)
+        title.genre.add(drama)
+        titles.append(title)
+    reviews = {
+        (title.name, author.username): Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score
+        )
+        for title in titles
+        for author, score in ((user, 8), (moderator, 4))
+    }
+    for review in reviews.values():
+        for author in (user, moderator):
+            Comment.objects.create(review=review, author=author, text='Ок')
+    return titles, reviews
+
+
+def seed_reviews(title, count):
+    """count отзывов разных авторов и по комментарию на каждый."""
+    from reviews.models import Title
+    from reviews.ratings import rebuild_ratings
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO reviews_user (password, is_superuser, username, '
+            'first_name, last_name, email, is_staff, is_active, '
+            'date_joined, bio, role, confirmation_code) '
+            "SELECT '!', false, 'purge_' || n, '', '', "
+            "'purge_' || n || '@yamdb.fake', false, true, now(), '', "
+            "'user', '' FROM generate_series(1, %s) AS n",
+            [count]
+        )
+        cursor.execute(
+            'INSERT INTO reviews_review (title_id, author_id, text, '
+            'score, pub_date, modified, comments_count) '
+            "SELECT %s, id, 'Отзыв', 5, now(), now(), 1 FROM reviews_user "
+            "WHERE username LIKE 'purge\\_%%'",
+            [title.pk]
+        )
+        cursor.execute(
+            'INSERT INTO reviews_comment '
+            '(review_id, author_id, text, pub_date, modified) '
+            "SELECT id, author_id, 'Комментарий', now(), now() "
+            'FROM reviews_review WHERE title_id = %s',
+            [title.pk]
+        )
+    rebuild_ratings(Title.objects.filter(pk=title.pk))
+
+
+class TestPurge:
+
+    def test_title(self, admin_client, library):
+        from reviews.facets import stale_facets
+        from reviews.models import Comment, Review, Title
+
+        titles, reviews = library
+        response = admin_client.delete(f'/api/v1/titles/{titles[0].pk}/')
+        assert response.status_code == 204
+        assert not Title.objects.filter(pk=titles[0].pk).exists()
+        assert not Review.objects.filter(title_id=titles[0].pk).exists()
+        assert Comment.objects.count() == 4, (
+            'Комментарии другого произведения должны остаться'
+        )
+        assert stale_facets() == [], 'Фасеты должны учесть удаление'
+
+    def test_review(self, admin_client, library):
+        from reviews.models import Comment
+        from reviews.ratings import stale_ratings
+
+        titles, reviews = library
+        review = reviews[(titles[0].name, 'TestUser')]
+        response = admin_client.delete(
+            f'/api/v1/titles/{titles[0].pk}/reviews/{review.pk}/'
+        )
+        assert response.status_code == 204
+        assert not Comment.objects.filter(review_id=review.pk).exists()
+        assert not stale_ratings().exists()
+        titles[0].refresh_from_db()
+        assert titles[0].rating == 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_user_fixes_counters(self, admin_client, anonymous_client,
+                                 library, user, moderator):
+        from reviews.activity import stale_comment_counts
+        from reviews.ratings import stale_ratings
+
+        titles, reviews = library
+        url = f'/api/v1/titles/{titles[1].pk}/'
+        assert anonymous_client.get(url).json()['rating'] == 6
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert not stale_ratings().exists(), (
+            'Рейтинги произведений должны учесть удалённые отзывы'
+        )
+        assert not stale_comment_counts().exists(), (
+            'Счётчики комментариев отзывов должны учесть удаление'
+        )
+        assert anonymous_client.get(url).json()['rating'] == 4, (
+            'Кэш ответов должен сброситься после удаления'
+        )
+        review = reviews[(titles[1].name, moderator.username)]
+        review.refresh_from_db()
+        assert review.comments_count == 1
+
+    def test_not_row_by_row(self, library):
+        from reviews.purge import purge_title
+
+        titles, reviews = library
+        seed_reviews(titles[0], 100)
+        with CaptureQueriesContext(connection) as queries:
+            purge_title(titles[0], chunk_size=25)
+        assert len(queries) < 50, (
+            'Отзывы должны удаляться пачками, а не по одному: '
+            f'{len(queries)} запросов на 100 отзывов'
+        )
+
+
+class TestPurgeMemory:
+
+    @staticmethod
+    def peak(title):
+        from reviews.purge import purge_title
+
+        tracemalloc.start()
+        try:
+            purge_title(title)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_memory_stays_flat(self):
+        from reviews.models import Review, Title, User
+
+        small = Title.objects.create(name='Малое', year=2000)
+        seed_reviews(small, 10000)
+        small_peak = self.peak(small)
+        User.objects.filter(username__startswith='purge_').delete()
+
+        large = Title.objects.create(name='Большое', year=2000)
+        seed_reviews(large, 100000)
+        large_peak = self.peak(large)
+
+        assert not Review.objects.exists()
+        assert large_peak < small_peak * 2, (
+            f'Пиковая память выросла с {small_peak} до {large_peak} байт '
+            'при удалении произведения со 100 тысячами отзывов'
+        )
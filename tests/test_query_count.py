@@ -0,0 +1,114 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+class TestQueryCount:
+    """Число запросов к базе не зависит от размера страницы.
+
+    Каждое чтение начинается с запроса валидатора для ETag,
+    а чтение произведений — ещё и с версии кэша ответов.
+
+    """
+
+    @pytest.mark.parametrize('limit', (1, 5))
+    def test_title_list(self, anonymous_client, catalogue,
+                        django_assert_num_queries, limit):
+        with django_assert_num_queries(5):
+            response = anonymous_client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+
+    def test_title_detail(self, anonymous_client, catalogue,
+                          django_assert_num_queries):
+        title = catalogue['titles'][0]
+        with django_assert_num_queries(4):
+            response = anonymous_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('limit', (1, 5))
+    def test_review_list(self, anonymous_client, catalogue,
+                         django_assert_num_queries, limit):
+        title = catalogue['titles'][0]
+        with django_assert_num_queries(4):
+            response = anonymous_client.get(
+                f'/api/v1/titles/{title.id}/reviews/?limit={limit}'
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+
+    def test_review_detail(self, anonymous_client, catalogue,
+                           django_assert_num_queries):
+        review = catalogue['reviews'][0]
+        with django_assert_num_queries(3):
+            response = anonymous_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            )
+        assert response.status_code == 200
+
+    def test_review_create(self, user_client, catalogue,
+                           django_assert_num_queries):
+        title = catalogue['titles'][1]
+        # Пользователь, проверка повторного отзыва, произведение,
+        # вставка и пересчёт рейтинга, плюс точка сохранения транзакции.
+        with django_assert_num_queries(7):
+            response = user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'Отзыв', 'score': 7},
+                format='json'
+            )
+        assert response.status_code == 201
+
+    @pytest.mark.parametrize('limit', (1, 5))
+    def test_comment_list(self, anonymous_client, catalogue,
+                          django_assert_num_queries, limit):
+        review = catalogue['reviews'][0]
+        with django_assert_num_queries(4):
+            response = anonymous_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+                f'/comments/?limit={limit}'
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+
+    def test_comment_detail(self, anonymous_client, catalogue,
+                            django_assert_num_queries):
+        comment = catalogue['comments'][0]
+        review = comment.review
+        with django_assert_num_queries(3):
+            response = anonymous_client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+                f'/comments/{comment.id}/'
+            )
+        assert response.status_code == 200
+
+    def test_comment_create(self, user_client, catalogue,
+                            django_assert_num_queries):
+        review = catalogue['reviews'][0]
+        # Пользователь, отзыв, вставка и счётчик комментариев отзыва,
+        # плюс точка сохранения транзакции.
+        with django_assert_num_queries(6):
+            response = user_client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+                f'/comments/',
+                {'text': 'Комментарий'},
+                format='json'
+            )
+        assert response.status_code == 201
+
+    def test_repeated_request_reuses_cached_user(self, user_client, catalogue,
+                                                 django_assert_num_queries):
+        review = catalogue['reviews'][0]
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            f'/comments/'
+        )
+        user_client.post(url, {'text': 'Первый'}, format='json')
+        with django_assert_num_queries(5):
+            response = user_client.post(
+                url, {'text': 'Второй'}, format='json'
+            )
+        assert response.status_code == 201
@@ -0,0 +1,187 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.benchmark import seed
+from reviews.models import Comment
+
+# Таблицы, которые на реальных данных растут без ограничений.
+LARGE_TABLES = {
+    'reviews_title', 'reviews_title_genre', 'reviews_review',
+    'reviews_comment',
+}
+# Узлы, под которыми полный просмотр таблицы не зависит от индексов:
+# подсчёт строк для пагинации или первые строки без сортировки.
+PASS_THROUGH_NODES = {'Aggregate', 'Limit', 'Gather', 'Gather Merge'}
+# Сортировка в памяти большего числа строк означает, что порядок
+# выдачи не поддержан индексом.
+SORT_ROWS_LIMIT = 1000
+HOT_ROWS = 5000
+NAME_TRGM_INDEX = 'reviews_title_name_upper_trgm'
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(scope='module')
+def large_catalogue(django_db_setup, django_db_blocker):
+    """Каталог, на котором планировщик выбирает план как в продакшене.
+
+    У первого произведения и первого отзыва тысячи отзывов и
+    комментариев, чтобы порядок выдачи нельзя было дёшево получить
+    сортировкой.
+
+    """
+    with django_db_blocker.unblock():
+        # Проверки внешних ключей кэшируют план в сессии: план,
+        # составленный на почти пустых таблицах, сделает вставку
+        # квадратичной, поэтому каталог заполняется в новом соединении.
+        connection.close()
+        data = seed(
+            titles=20000, reviews_per_title=10, comments_per_review=0,
+            categories=50, genres=100
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO reviews_user (password, is_superuser, username, '
+                'first_name, last_name, email, is_staff, is_active, '
+                'date_joined, bio, role, confirmation_code) '
+                "SELECT '!', false, 'hot_' || n, '', '', "
+                "'hot_' || n || '@yamdb.fake', false, true, now(), '', "
+                "'user', '' FROM generate_series(1, %s) AS n",
+                [HOT_ROWS]
+            )
+            cursor.execute(
+                'INSERT INTO reviews_review (title_id, author_id, text, '
+                'score, pub_date, modified, comments_count) '
+                "SELECT %s, id, 'Отзыв', 5, now(), now(), 0 FROM reviews_user "
+                "WHERE username LIKE 'hot\\_%%'",
+                [data['title'].pk]
+            )
+            # Без статистики проверка внешнего ключа комментариев
+            # планируется перебором отзывов на каждую строку.
+            cursor.execute('ANALYZE reviews_review')
+            cursor.execute(
+                'INSERT INTO reviews_comment '
+                '(review_id, author_id, text, pub_date, modified) '
+                'SELECT id, author_id, %s, pub_date, pub_date '
+                'FROM reviews_review',
+                ['Комментарий']
+            )
+            cursor.execute(
+                'INSERT INTO reviews_comment '
+                '(review_id, author_id, text, pub_date, modified) '
+                'SELECT %s, %s, %s, now(), now() '
+                'FROM generate_series(1, %s)',
+                [data['review'].pk, data['user'].pk, 'Комментарий', HOT_ROWS]
+            )
+            cursor.execute('ANALYZE')
+        data['comment'] = Comment.objects.filter(
+            review=data['review']).first()
+        yield data
+        call_command('flush', interactive=False, verbosity=0)
+
+
+def has_trgm_index():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_indexes WHERE indexname = %s',
+            [NAME_TRGM_INDEX]
+        )
+        return cursor.fetchone() is not None
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def plan_problems(node, ancestors=()):
+    """Полные просмотры больших таблиц и крупные сортировки в памяти."""
+    if node['Node Type'] == 'Seq Scan' and (
+            node['Relation Name'] in LARGE_TABLES):
+        inherent = 'Filter' not in node and all(
+            parent in PASS_THROUGH_NODES for parent in ancestors
+        )
+        if not inherent:
+            yield f'Seq Scan on {node["Relation Name"]}'
+    if node['Node Type'] == 'Sort' and node['Plan Rows'] >= SORT_ROWS_LIMIT:
+        yield f'Sort of {node["Plan Rows"]} rows'
+    for child in node.get('Plans', ()):
+        yield from plan_problems(child, ancestors + (node['Node Type'],))
+
+
+def endpoints(data):
+    title = data['title']
+    review = data['review']
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{title.pk}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    return {
+        'titles.list': titles,
+        'titles.list.offset': f'{titles}?offset=50',
+        'titles.list.cursor': f'{titles}?pagination=cursor',
+        'titles.list.filter_genre': f'{titles}?genre={data["genre"].slug}',
+        'titles.list.filter_category':
+            f'{titles}?category={data["category"].slug}',
+        'titles.list.filter_year': f'{titles}?year_min=1960&year_max=1961',
+        'titles.list.filter_name': f'{titles}?name=дение 1234',
+        'titles.retrieve': f'{titles}{title.pk}/',
+        'titles.facets': f'{titles}facets/',
+        'titles.facets.filter_category':
+            f'{titles}facets/?category={data["category"].slug}',
+        'titles.top': f'{titles}top/',
+        'titles.top.category': f'{titles}top/?category={data["category"].slug}',
+        'titles.trending': f'{titles}trending/',
+        'titles.trending.genre': f'{titles}trending/?genre={data["genre"].slug}',
+        'reviews.list': reviews,
+        'reviews.list.cursor': f'{reviews}?pagination=cursor',
+        'reviews.retrieve': f'{reviews}{review.pk}/',
+        'comments.list': comments,
+        'comments.list.cursor': f'{comments}?pagination=cursor',
+        'comments.retrieve': f'{comments}{data["comment"].pk}/',
+    }
+
+
+ENDPOINTS = (
+    'titles.list', 'titles.list.offset', 'titles.list.cursor',
+    'titles.list.filter_genre', 'titles.list.filter_category',
+    'titles.list.filter_year', 'titles.list.filter_name', 'titles.retrieve',
+    'titles.facets', 'titles.facets.filter_category',
+    'titles.top', 'titles.top.category', 'titles.trending',
+    'titles.trending.genre',
+    'reviews.list', 'reviews.list.cursor', 'reviews.retrieve',
+    'comments.list', 'comments.list.cursor', 'comments.retrieve',
+)
+
+
+@pytest.mark.usefixtures('clear_caches')
+class TestQueryPlans:
+    """Запросы эндпоинтов опираются на индексы, а не на полный просмотр."""
+
+    @pytest.mark.parametrize('endpoint', ENDPOINTS)
+    def test_plan_uses_indexes(self, large_catalogue, endpoint):
+        if endpoint == 'titles.list.filter_name' and not has_trgm_index():
+            pytest.skip('Нет расширения pg_trgm для поиска по подстроке')
+        url = endpoints(large_catalogue)[endpoint]
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get(url)
+        assert response.status_code == 200
+        problems = []
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            found = sorted(set(plan_problems(explain(query['sql']))))
+            if found:
+                problems.append(f'{", ".join(found)}: {query["sql"]}')
+        assert not problems, (
+            f'Эндпоинт {endpoint} обходится без индекса:\n'
+            + '\n'.join(problems)
+        )
@@ -0,0 +1,83 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def title():
+    from reviews.models import Title
+
+    return Title.objects.create(name='Фильм', year=2000)
+
+
+def stored(title):
+    title.refresh_from_db()
+    return title.score_sum, title.reviews_count, title.rating
+
+
+class TestRating:
+
+    def test_create_update_delete(self, title, user, moderator):
+        from reviews.models import Review
+
+        assert stored(title) == (0, 0, None)
+        first = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        assert stored(title) == (8, 1, 8)
+        Review.objects.create(
+            title=title, author=moderator, text='Отзыв', score=3
+        )
+        assert stored(title) == (11, 2, 5.5)
+
+        first.score = 10
+        first.save()
+        assert stored(title) == (13, 2, 6.5), (
+            'Правка оценки должна сдвигать рейтинг на разницу'
+        )
+
+        first.delete()
+        assert stored(title) == (3, 1, 3)
+        moderator.delete()
+        assert stored(title) == (0, 0, None), (
+            'Каскадное удаление отзывов вместе с автором обнуляет рейтинг'
+        )
+
+    def test_move_between_titles(self, title, user):
+        from reviews.models import Review, Title
+
+        other = Title.objects.create(name='Другой', year=2001)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=6
+        )
+        review.title = other
+        review.save()
+        assert stored(title) == (0, 0, None)
+        assert stored(other) == (6, 1, 6)
+
+    def test_api(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = user_client.post(
+            f'{url}reviews/', {'text': 'Отзыв', 'score': 9}
+        )
+        assert response.status_code == 201
+        assert user_client.get(url).json()['rating'] == 9
+
+
+class TestRebuildRatings:
+
+    def test_check_and_rebuild(self, title, user):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='Отзыв', score=7)
+        call_command('rebuild_ratings', '--check')
+        Title.objects.filter(pk=title.pk).update(
+            score_sum=100, reviews_count=5, rating=20
+        )
+        with pytest.raises(CommandError, match=str(title.pk)):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings', '--batch-size', '1')
+        assert stored(title) == (7, 1, 7)
+        call_command('rebuild_ratings', '--check')
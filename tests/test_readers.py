@@ -0,0 +1,51 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.readers import TitleReader, ordered_genres
+from api.serializers import TitleReadSerializer
+from reviews.models import Title
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+class TestTitleReader:
+    """Быстрое чтение даёт тот же JSON, что и сериализатор."""
+
+    def test_output_matches_serializer(self, catalogue):
+        Title.objects.create(name='Без категории и жанров', year=1999)
+        queryset = Title.objects.select_related('category').prefetch_related(
+            ordered_genres()).order_by('name', 'id')
+        reader = TitleReader()
+        renderer = JSONRenderer()
+
+        expected = renderer.render(
+            TitleReadSerializer(queryset, many=True).data
+        )
+        actual = renderer.render(
+            reader.to_representation(reader.values(queryset))
+        )
+        assert actual == expected, (
+            'Ответ TitleReader должен совпадать с TitleReadSerializer '
+            'побайтно'
+        )
+
+    def test_list_and_detail(self, anonymous_client, catalogue):
+        title = Title.objects.prefetch_related(ordered_genres()).get(
+            pk=catalogue['titles'][0].pk
+        )
+        detail = anonymous_client.get(f'/api/v1/titles/{title.id}/')
+        assert detail.status_code == 200
+        assert detail.content == JSONRenderer().render(
+            TitleReadSerializer(title).data
+        )
+        response = anonymous_client.get(
+            '/api/v1/titles/?pagination=cursor&genre=drama'
+        )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 5
+        assert response.json()['next'], 'Курсор строится и по словарям'
+        response = anonymous_client.get('/api/v1/titles/0/')
+        assert response.status_code == 404
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+from django.db import connections
+
+from api.cache import replica_pins
+
+REPLICA = 'replica'
+
+
+@pytest.fixture(scope='module')
+def replica_database(django_db_setup, django_db_blocker):
+    """Отдельная база в роли реплики, которая не получает записей."""
+    connections.databases[REPLICA] = {
+        **connections.databases['default'],
+        'NAME': 'yamdb_replica',
+        'TEST': {'NAME': 'test_yamdb_replica'},
+    }
+    with django_db_blocker.unblock():
+        creation = connections[REPLICA].creation
+        creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    yield REPLICA
+    with django_db_blocker.unblock():
+        creation.destroy_test_db('yamdb_replica', verbosity=0)
+    del connections.databases[REPLICA]
+    del connections[REPLICA]
+
+
+@pytest.fixture
+def replicas(settings, replica_database):
+    settings.DATABASE_REPLICAS = [replica_database]
+    return replica_database
+
+
+@pytest.fixture
+def title(user, replicas):
+    from reviews.models import Title
+
+    title = Title.objects.create(name='Произведение', year=2000)
+    title.save(using=replicas)
+    user.save(using=replicas)
+    return title
+
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=['default', REPLICA]),
+    pytest.mark.usefixtures('replica_database', 'clear_caches'),
+]
+
+
+def reviews_url(title):
+    return f'/api/v1/titles/{title.pk}/reviews/'
+
+
+def post_review(client, title):
+    response = client.post(
+        reviews_url(title), {'text': 'Отзыв', 'score': 7}, format='json'
+    )
+    assert response.status_code == 201
+    return response
+
+
+class TestReplicaRouting:
+    """Чтение уходит на реплики, запись и чтение после неё — на основную."""
+
+    def test_safe_requests_read_from_replica(self, anonymous_client, title):
+        from reviews.models import Title
+
+        Title.objects.create(name='Только на основной', year=2001)
+        response = anonymous_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.data['count'] == 1, (
+            'Список произведений должен читаться с реплики'
+        )
+
+    def test_writes_go_to_primary(self, user_client, title, replicas):
+        from reviews.models import Review
+
+        post_review(user_client, title)
+        assert Review.objects.using('default').count() == 1
+        assert Review.objects.using(replicas).count() == 0, (
+            'Запись не должна попадать на реплику'
+        )
+
+    def test_writer_reads_own_writes(self, user_client, anonymous_client,
+                                     title):
+        post_review(user_client, title)
+        response = user_client.get(reviews_url(title))
+        assert response.data['count'] == 1, (
+            'После записи клиент должен читать с основной базы'
+        )
+        response = anonymous_client.get(reviews_url(title))
+        assert response.data['count'] == 0, (
+            'Остальные клиенты по-прежнему читают с реплики'
+        )
+
+    def test_pin_is_kept_by_cookie(self, user_client, anonymous_client,
+                                   title):
+        post_review(user_client, title)
+        anonymous_client.cookies.update(user_client.cookies)
+        response = anonymous_client.get(reviews_url(title))
+        assert response.data['count'] == 1, (
+            'Клиент без токена узнаётся по cookie после записи'
+        )
+
+    def test_pin_expires(self, settings, monkeypatch, user_client, title):
+        settings.REPLICA_PIN_SECONDS = 0.2
+        monkeypatch.setattr(replica_pins, 'timeout', 0.2)
+        post_review(user_client, title)
+        time.sleep(0.3)
+        user_client.cookies.clear()
+        response = user_client.get(reviews_url(title))
+        assert response.data['count'] == 0, (
+            'По истечении окна клиент снова читает с реплики'
+        )
+
+    def test_lagging_replica_response_is_not_cached(
+            self, settings, admin_client, anonymous_client, title):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        response = admin_client.post('/api/v1/titles/', {
+            'name': 'Новое', 'year': 2001, 'category': 'movie',
+            'genre': ['drama'],
+        }, format='json')
+        assert response.status_code == 201
+        response = anonymous_client.get('/api/v1/titles/')
+        assert response.data['count'] == 1
+        settings.DATABASE_REPLICAS = []
+        response = anonymous_client.get('/api/v1/titles/')
+        assert response.data['count'] == 2, (
+            'Ответ реплики сразу после записи не должен попадать в кэш'
+        )
+
+    def test_without_replicas_everything_uses_primary(
+            self, settings, user_client, title):
+        settings.DATABASE_REPLICAS = []
+        post_review(user_client, title)
+        assert 'primary_until' not in user_client.cookies
+        user_client.credentials()
+        response = user_client.get(reviews_url(title))
+        assert response.data['count'] == 1
@@ -0,0 +1,134 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('clear_caches'),
+]
+
+
+@pytest.fixture
+def review(user, moderator):
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    title = Title.objects.create(
+        name='Фильм', year=2000, description='Описание',
+        category=Category.objects.create(name='Кино', slug='movie')
+    )
+    title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+    Comment.objects.create(review=review, author=moderator, text='Ок')
+    return review
+
+
+def capture(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), ' '.join(query['sql'] for query in queries)
+
+
+class TestTitleFields:
+
+    def test_fields(self, anonymous_client, review):
+        data, sql = capture(
+            anonymous_client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert list(data['results'][0]) == ['id', 'rating', 'name']
+        assert 'reviews_title_genre' not in sql, (
+            'Без поля genre жанры не должны запрашиваться'
+        )
+        assert 'reviews_category' not in sql
+        assert '"description"' not in sql
+
+    def test_omit(self, anonymous_client, review):
+        data, sql = capture(
+            anonymous_client,
+            f'/api/v1/titles/{review.title_id}/?omit=description,genre'
+        )
+        assert list(data) == ['id', 'category', 'rating', 'name', 'year']
+        assert data['category'] == {'name': 'Кино', 'slug': 'movie'}
+
+    def test_full_response_unchanged(self, anonymous_client, review):
+        sparse = anonymous_client.get('/api/v1/titles/?fields=genre').json()
+        full = anonymous_client.get('/api/v1/titles/').json()
+        assert sparse['results'] == [
+            {'genre': [{'name': 'Драма', 'slug': 'drama'}]}
+        ]
+        assert list(full['results'][0]) == [
+            'id', 'category', 'genre', 'rating', 'name', 'year',
+            'description',
+        ], 'Без параметров ответ из кэша не должен обрезаться'
+
+    def test_cursor_pagination(self, anonymous_client, review):
+        from reviews.models import Title
+
+        for number in range(6):
+            Title.objects.create(name=f'Фильм {number}', year=2000)
+        data = anonymous_client.get(
+            '/api/v1/titles/?pagination=cursor&fields=year'
+        ).json()
+        assert data['results'][0] == {'year': 2000}
+        assert anonymous_client.get(data['next']).status_code == 200
+
+    def test_leaderboard(self, anonymous_client, review):
+        data, sql = capture(
+            anonymous_client, '/api/v1/titles/top/?fields=name,rating'
+        )
+        assert data == [{'rating': 7.0, 'name': 'Фильм'}]
+        assert 'reviews_title_genre' not in sql
+
+    def test_unknown_field(self, anonymous_client):
+        response = anonymous_client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400
+        assert 'secret' in response.json()['fields'][0]
+
+
+class TestReviewAndCommentFields:
+
+    def test_reviews(self, anonymous_client, review):
+        data, sql = capture(
+            anonymous_client,
+            f'/api/v1/titles/{review.title_id}/reviews/?fields=id,score'
+        )
+        assert data['results'] == [{'id': review.pk, 'score': 7}]
+        assert 'reviews_user' not in sql, (
+            'Без поля author автор не должен присоединяться'
+        )
+        assert '"text"' not in sql
+
+    def test_comments(self, anonymous_client, review):
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+            'comments/?omit=review,pub_date'
+        )
+        data, sql = capture(anonymous_client, url)
+        assert list(data['results'][0]) == ['id', 'text', 'author']
+        assert data['results'][0]['author'] == 'TestModerator'
+
+    def test_write_returns_all_fields(self, user_client, review):
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+            'comments/?fields=id'
+        )
+        response = user_client.post(url, {'text': 'Новый'})
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Новый', (
+            'Параметры fields и omit действуют только на чтение'
+        )
+
+
+class TestUserFields:
+
+    def test_users(self, admin_client, user):
+        admin_client.get('/api/v1/users/')
+        data, sql = capture(
+            admin_client, '/api/v1/users/?fields=username,role'
+        )
+        assert {'username': 'TestUser', 'role': 'user'} in data['results']
+        assert all(list(item) == ['username', 'role']
+                   for item in data['results'])
+        assert '"bio"' not in sql, 'Ненужные столбцы не должны читаться'
@@ -0,0 +1,95 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+FINDERS = ['django.contrib.staticfiles.finders.FileSystemFinder']
+
+
+@pytest.fixture
+def collect(tmp_path):
+    """Запускает collectstatic только по каталогам source в tmp_path."""
+    root = tmp_path / 'collected'
+
+    def run(*sources):
+        with override_settings(
+            STATIC_ROOT=str(root),
+            STATICFILES_DIRS=[str(source) for source in sources],
+            STATICFILES_FINDERS=FINDERS,
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        return root, json.loads((root / 'staticfiles.json').read_text())
+
+    return run
+
+
+class TestCollectStatic:
+
+    def test_hashed_and_compressed(self, tmp_path, collect):
+        source = tmp_path / 'source'
+        source.mkdir()
+        css = 'body { margin: 0; }\n' * 100
+        (source / 'app.css').write_text(css)
+        (source / 'tiny.js').write_text('1;')
+        (source / 'logo.png').write_bytes(b'\x89PNG' + bytes(range(256)) * 4)
+
+        root, manifest = collect(source)
+        hashed = manifest['paths']['app.css']
+        assert hashed != 'app.css', 'В имени файла должен быть хэш содержимого'
+        for name in ('app.css', hashed):
+            with gzip.open(root / f'{name}.gz') as compressed:
+                assert compressed.read().decode() == css
+        assert not (root / 'tiny.js.gz').exists(), (
+            'Файлы меньше min_size не сжимаются'
+        )
+        assert not (root / 'logo.png.gz').exists(), (
+            'Картинки уже сжаты и не должны сжиматься повторно'
+        )
+
+    def test_brotli(self, tmp_path, collect):
+        brotli = pytest.importorskip('brotli')
+        source = tmp_path / 'source'
+        source.mkdir()
+        (source / 'app.js').write_text('var answer = 42;\n' * 100)
+
+        root, manifest = collect(source)
+        assert brotli.decompress(
+            (root / 'app.js.br').read_bytes()
+        ) == (source / 'app.js').read_bytes()
+
+    def test_recollect_replaces_variants(self, tmp_path, collect):
+        source = tmp_path / 'source'
+        source.mkdir()
+        (source / 'app.css').write_text('a { color: red; }\n' * 100)
+        collect(source)
+        (source / 'app.css').write_text('b { color: blue; }\n' * 100)
+        # collectstatic сравнивает время изменения с точностью до секунды.
+        modified = time.time() + 10
+        os.utime(source / 'app.css', (modified, modified))
+
+        root, manifest = collect(source)
+        with gzip.open(root / 'app.css.gz') as compressed:
+            assert compressed.read().startswith(b'b {'), (
+                'Повторный collectstatic должен перезаписать сжатую копию'
+            )
+        assert not [
+            path.name for path in root.iterdir() if '_' in path.name
+        ], 'Старые сжатые копии не должны оставаться под другими именами'
+
+
+class TestRedoc:
+
+    @pytest.mark.django_db
+    def test_uses_hashed_spec(self, anonymous_client, collect, settings):
+        root, manifest = collect(*settings.STATICFILES_DIRS)
+        with override_settings(STATIC_ROOT=str(root)):
+            response = anonymous_client.get('/redoc/')
+        assert response.status_code == 200
+        hashed = manifest['paths']['redoc.yaml']
+        assert f'/static/{hashed}' in response.content.decode(), (
+            'Документация должна ссылаться на спецификацию с хэшем в имени'
+        )
@@ -0,0 +1,165 @@
+import pytest
+from django.test import RequestFactory, override_settings
+
+pytestmark = pytest.mark.django_db
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+class TestSignupThrottle:
+
+    @override_settings(API_THROTTLE_RATES={'signup': '3/min'})
+    def test_per_ip(self, anonymous_client):
+        for _ in range(3):
+            assert anonymous_client.post(SIGNUP_URL).status_code == 400
+        response = anonymous_client.post(SIGNUP_URL)
+        assert response.status_code == 429, (
+            'После исчерпания корзины регистрация должна возвращать 429'
+        )
+        assert int(response['Retry-After']) > 0
+        other = anonymous_client.post(
+            SIGNUP_URL, HTTP_X_FORWARDED_FOR='10.0.0.2'
+        )
+        assert other.status_code == 400, (
+            'Корзина заводится на каждый IP-адрес клиента'
+        )
+
+    @override_settings(API_THROTTLE_RATES={'signup': ''})
+    def test_disabled(self, anonymous_client):
+        for _ in range(10):
+            assert anonymous_client.post(SIGNUP_URL).status_code == 400
+
+    @override_settings(API_THROTTLE_RATES={'signup': '1/min', 'token': '1/min'})
+    def test_scopes_are_separate(self, anonymous_client):
+        assert anonymous_client.post(SIGNUP_URL).status_code == 400
+        assert anonymous_client.post(TOKEN_URL).status_code == 400, (
+            'Регистрация и получение токена ограничиваются раздельно'
+        )
+        assert anonymous_client.post(TOKEN_URL).status_code == 429
+
+
+class TestWriteThrottle:
+
+    @override_settings(API_THROTTLE_RATES={'review': '2/min'})
+    def test_reviews_per_user(self, user_client, moderator_client):
+        from reviews.models import Title
+
+        titles = [
+            Title.objects.create(name=f'Фильм {number}', year=2000)
+            for number in range(3)
+        ]
+        statuses = [
+            user_client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                {'text': 'Отзыв', 'score': 5}
+            ).status_code
+            for title in titles
+        ]
+        assert statuses == [201, 201, 429]
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/'
+        assert user_client.get(url).status_code == 200, (
+            'Чтение отзывов не должно ограничиваться'
+        )
+        response = moderator_client.post(
+            f'/api/v1/titles/{titles[2].pk}/reviews/',
+            {'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == 201, (
+            'У каждого пользователя своя корзина'
+        )
+
+    @override_settings(API_THROTTLE_RATES={'comment': '1/min'})
+    def test_comments(self, user_client, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        assert user_client.post(url, {'text': 'Раз'}).status_code == 201
+        assert user_client.post(url, {'text': 'Два'}).status_code == 429
+
+
+class TestBuckets:
+
+    def test_locmem_refills(self, monkeypatch):
+        from api import throttling
+
+        now = [100.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: now[0])
+        buckets = throttling.LocMemBuckets()
+        assert buckets.consume('key', 2, 1.0) == 0
+        assert buckets.consume('key', 2, 1.0) == 0
+        assert buckets.consume('key', 2, 1.0) == pytest.approx(1.0)
+        now[0] += 0.5
+        assert buckets.consume('key', 2, 1.0) == pytest.approx(0.5), (
+            'Отказ не должен списывать токены'
+        )
+        now[0] += 0.5
+        assert buckets.consume('key', 2, 1.0) == 0, (
+            'Корзина пополняется равномерно, без ожидания нового окна'
+        )
+
+    def test_database(self):
+        from api.throttling import DatabaseBuckets
+        from reviews.models import ThrottleBucket
+
+        buckets = DatabaseBuckets()
+        assert buckets.consume('key', 2, 0.001) == 0
+        assert buckets.consume('key', 2, 0.001) == 0
+        wait = buckets.consume('key', 2, 0.001)
+        assert 0 < wait <= 1000
+        assert buckets.consume('other', 2, 0.001) == 0
+        assert ThrottleBucket.objects.get(key='key').tokens < 1
+
+        ThrottleBucket.objects.filter(key='key').update(full_at=0)
+        buckets.purge()
+        assert list(
+            ThrottleBucket.objects.values_list('key', flat=True)
+        ) == ['other'], 'Полные корзины удаляются'
+
+
+class TestConcurrencyLimit:
+
+    @staticmethod
+    def nested(method, outer_method='post'):
+        """Ответ на запрос, пришедший, пока выполняется другой."""
+        from api.middleware import ConcurrencyLimitMiddleware
+
+        factory = RequestFactory()
+        inner = []
+
+        def view(request):
+            if not inner:
+                inner.append(None)
+                inner[0] = middleware(getattr(factory, method)('/'))
+            return 'ok'
+
+        middleware = ConcurrencyLimitMiddleware(view)
+        assert middleware(getattr(factory, outer_method)('/')) == 'ok'
+        assert middleware.in_flight == middleware.writes_in_flight == 0, (
+            'Счётчики выполняемых запросов должны возвращаться к нулю'
+        )
+        return inner[0]
+
+    @override_settings(API_MAX_IN_FLIGHT=0, API_MAX_IN_FLIGHT_WRITES=1)
+    def test_writes_shed_before_reads(self):
+        response = self.nested('post')
+        assert response.status_code == 429
+        assert response['Retry-After'] == '1'
+        assert self.nested('get') == 'ok', (
+            'Предел записей не должен мешать чтению'
+        )
+
+    @override_settings(API_MAX_IN_FLIGHT=1, API_MAX_IN_FLIGHT_WRITES=0)
+    def test_overloaded(self):
+        response = self.nested('get', outer_method='get')
+        assert response.status_code == 503, (
+            'Сверх общего предела любой запрос получает 503'
+        )
+
+    @override_settings(API_MAX_IN_FLIGHT=0, API_MAX_IN_FLIGHT_WRITES=0)
+    def test_disabled(self):
+        assert self.nested('post') == 'ok'